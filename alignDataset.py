@@ -1,152 +1,236 @@
 #!"C:\Program Files\Python310"
 
 # Import libraries that are used in the alignment process.
-import copy
-import csv
+import json
 import os
+import numpy as np
 from pathlib import Path
+from imuLoader import SensorData, getSensorData, writeSensorCSV
+from sessionFile import sessionExtension, readSession, writeSession
+from resultCache import ResultCache, getCacheKey, getFileHash
 
-# Global variables for the IDs of the sensors, and the new directory 
-# to create and save the aligned files to.
-leftId = 'TS-04223'
-rightId = 'TS-04204'
-pelvisId = 'TS-04205'
+# Global variable for the new directory to create and save the aligned files to.
 saveLocation = 'alignedData'
 
+# Global variables for the configuration file of the rotation table, read from the directory the alignment is started in,
+# and the table itself: the 3x3 matrix of each sensor ID, where row i gives the new axis i from the original x, y and z axes.
+# A new sensor kit only needs its sensor IDs and matrices added to the configuration file.
+alignmentFilename = 'sensorAlignment.json'
+alignmentTable = {}
+
+# Global variables for estimating the mounting rotation of each sensor from gravity, for when a sensor is not strapped on in its usual orientation.
+# The mean accelerometer reading of the quietest window of each file (the number of samples with the lowest variance) is rotated, after the matrix
+# of the table, onto the reference gravity (the direction of the reading when standing still, in the aligned axes, where up is -y as used by the
+# thresholds of the cropper and segmentation). A quiet window whose mean is not within the tolerance (as a fraction) of standard gravity is treated
+# as movement, and only the matrix of the table is used. The window is short enough (0.25 s at 1600 Hz) to fit in the standing before the drop or after
+# the landing of a cropped jump. When even the quietest window has a summed variance of the axes above the limit (in (m/s/s)^2), no still window
+# is found, and the files of that sensor are not aligned.
+estimateOrientation = False
+quietSampleCount = 400
+quietVarianceLimit = 1.0
+referenceGravity = [0, -1, 0]
+standardGravity = 9.80665
+gravityTolerance = 0.25
+
+# Global variables for keeping the estimated rotation of every sensor of each session in an on-disk cache, keyed by the hash of the
+# accelerometer datum and the settings, so the gyroscope of the same sensor and later runs reuse it. The version is increased whenever
+# the estimate itself changes, so older cached rotations are not reused.
+orientationCacheFilename = 'orientationCache.db'
+orientationCacheVersion = 2
+orientationCache = None
+
 #=====================================================
 #CHAPTER: Functions implemented for aligning the values correctly.
 #=====================================================
-# Get the dictionary representation of a CSV file.
-#
-# filename: The name of the file to read and return.
-def getCSVDict(filename):
-    csvFile = open(filename)
-    csvreader = csv.DictReader(csvFile)
-    return[row for row in csvreader]
-
-#=====================================================
-# Write the aligned dictionary to a new CSV file based 
+# Write the aligned datum to a new CSV file based 
 # on the consistent alignment axis selected.
 # 
 # filename:     The name of the file for saving the new file with.
-# alignedDict:  The dictionary of newly aligned values.
-# lowgFile:     Boolean value depicting the correct formatting for the header and writing rows.
-def writeNewCSV(filename, alignedDict, lowgFile):
-    #Create new file object
-    newfile = open(saveLocation + '\\' + filename, mode='w', newline='')
-
-    #Alter the header item depending if we need gyroscope values as well and write this to the new file.
-    if lowgFile:
-        header_item = ['unix_timestamp_microsec', 'ax_m/s/s', 'ay_m/s/s', 'az_m/s/s', 'gx_deg/s', 'gy_deg/s', 'gz_deg/s']
-    else:
-        header_item = ['unix_timestamp_microsec', 'ax_m/s/s', 'ay_m/s/s', 'az_m/s/s']
-    csvwriter = csv.DictWriter(newfile, fieldnames=header_item)
-    csvwriter.writeheader()
-
-    #For every value in the new aligned dictionary, print the current row with required variables.
-    for x in range(0, len(alignedDict)):
-        if lowgFile:
-            current_row = {'unix_timestamp_microsec':alignedDict[x]['unix_timestamp_microsec'],
-                           'gx_deg/s':alignedDict[x]['gx_deg/s'], 'gy_deg/s':alignedDict[x]['gy_deg/s'], 'gz_deg/s':alignedDict[x]['gz_deg/s']}
-        else:
-            current_row = {'unix_timestamp_microsec':alignedDict[x]['unix_timestamp_microsec'], 'ax_m/s/s':alignedDict[x]['ax_m/s/s'], 'ay_m/s/s':alignedDict[x]['ay_m/s/s'], 'az_m/s/s':alignedDict[x]['az_m/s/s']}
-        csvwriter.writerow(current_row)
-
-#=====================================================
-# A function for applying the logic required for correctly aligning the axes to a consistent axis.
+# alignedData:  The columnar datum of newly aligned values.
+def writeNewCSV(filename, alignedData):
+    #The header is taken from the columns of the datum, so only the relevant accelerometer or gyroscope labels are written.
+    writeSensorCSV(saveLocation + '\\' + filename, alignedData)
+
+#=====================================================
+# Read the rotation table from a configuration file, holding the position and matrix of every sensor ID, i.e.,
+# {"sensors": {"TS-04204": {"position": "rightAnkle", "matrix": [[0, 0, 1], [0, 1, 0], [1, 0, 0]]}}} for X = Z, Y = Y and Z = X.
+#
+# filename:     The name of the configuration file.
+def getAlignmentTable(filename):
+    with open(filename, mode = 'r') as configFile:
+        sensors = json.load(configFile)['sensors']
+
+    table = {}
+    for sensorId in sensors:
+        matrix = np.array(sensors[sensorId]['matrix'], dtype = np.float64)
+        if matrix.shape != (3, 3):
+            raise ValueError('The alignment matrix of ' + sensorId + ' must be 3x3, but it is ' + str(matrix.shape) + '.')
+        table[sensorId] = matrix
+    return table
+
+#=====================================================
+#CHAPTER: Functions implemented for estimating the orientation of each sensor from gravity.
+#=====================================================
+# The error raised when the orientation of a sensor cannot be estimated, so the files of that sensor can be skipped.
+class OrientationError(Exception):
+    pass
+
+#=====================================================
+# Return the smallest rotation that turns one direction onto another, using the Rodrigues rotation formula.
+#
+# measured:     The direction to rotate from.
+# reference:    The direction to rotate onto.
+def getGravityRotation(measured, reference):
+    measured = np.asarray(measured, dtype = np.float64) / np.linalg.norm(measured)
+    reference = np.asarray(reference, dtype = np.float64) / np.linalg.norm(reference)
+    axis = np.cross(measured, reference)
+    cosine = float(np.dot(measured, reference))
+
+    #When the directions are opposite, turn half a rotation about any axis at a right angle to the measured direction.
+    if cosine < -1 + 1e-9:
+        perpendicular = np.cross(measured, [1.0, 0.0, 0.0])
+        if np.linalg.norm(perpendicular) < 1e-6:
+            perpendicular = np.cross(measured, [0.0, 1.0, 0.0])
+        perpendicular = perpendicular / np.linalg.norm(perpendicular)
+        return 2 * np.outer(perpendicular, perpendicular) - np.eye(3)
+
+    skew = np.array([[0, -axis[2], axis[1]], [axis[2], 0, -axis[0]], [-axis[1], axis[0], 0]])
+    return np.eye(3) + skew + skew @ skew / (1 + cosine)
+
+#=====================================================
+# Find the quietest window of an accelerometer datum, which is the window of quietSampleCount samples (or the whole datum when it is shorter)
+# with the lowest summed variance of the axes. Every window is measured at once from running sums of the values and their squares.
+# Returns [mean, variance], the mean reading of each axis in the window and the summed variance of the window.
+#
+# values:       The (samples x axes) array of accelerometer values.
+def getQuietWindow(values):
+    values = np.asarray(values, dtype = np.float64)
+    windowSize = min(quietSampleCount, len(values))
+    sums = np.cumsum(np.vstack((np.zeros((1, values.shape[1])), values)), axis = 0)
+    squares = np.cumsum(np.vstack((np.zeros((1, values.shape[1])), np.square(values))), axis = 0)
+
+    windowSums = sums[windowSize:] - sums[:-windowSize]
+    windowSquares = squares[windowSize:] - squares[:-windowSize]
+    variances = np.maximum(windowSquares - np.square(windowSums) / windowSize, 0).sum(axis = 1) / windowSize
+    start = int(np.argmin(variances))
+    return [windowSums[start] / windowSize, float(variances[start])]
+
+#=====================================================
+# Estimate the mounting rotation of a sensor from the mean gravity of the quietest window of its accelerometer datum.
+# The matrix of the table is applied first, so the estimate only corrects the tilt of the sensor and keeps its usual heading.
+# Returns the matrix of the table when the quiet window does not measure gravity, and raises an OrientationError when no still window is found.
+#
+# accData:      The columnar accelerometer datum of the sensor, with the sensor ID set.
+def estimateSensorRotation(accData):
+    matrix = alignmentTable[accData.sensorId]
+    quietWindow = getQuietWindow(accData.values)
+    if quietWindow[1] > quietVarianceLimit:
+        raise OrientationError('No still window of ' + str(quietSampleCount) + ' samples was found for ' + str(accData.sensorId) + ' (the quietest has a variance of '
+                               + str(round(quietWindow[1], 3)) + '), so its orientation cannot be estimated. Lower quietSampleCount, raise quietVarianceLimit, or disable estimateOrientation.')
+    gravity = matrix @ quietWindow[0]
+    if abs(np.linalg.norm(gravity) - standardGravity) > gravityTolerance * standardGravity:
+        print("WARNING: THE QUIET WINDOW OF " + str(accData.sensorId) + " DOES NOT MEASURE GRAVITY, SO THE TABLE IS USED.")
+        return matrix
+    return getGravityRotation(gravity, referenceGravity) @ matrix
+
+#=====================================================
+# Check that the estimate leaves every sensor of the table unchanged when it is mounted as the table expects, so a rest reading that the
+# matrix of the table already aligns onto the reference gravity keeps the matrix of the table. Raises a ValueError for any sensor that it changes.
+def checkOrientationEstimate():
+    reference = np.asarray(referenceGravity, dtype = np.float64)
+    for sensorId in alignmentTable:
+        matrix = alignmentTable[sensorId]
+        restReading = np.linalg.solve(matrix, standardGravity * reference / np.linalg.norm(reference))
+        rotation = estimateSensorRotation(SensorData(None, np.tile(restReading, (2, 1)), ['ax_m/s/s', 'ay_m/s/s', 'az_m/s/s'], sensorId))
+        if not np.allclose(rotation, matrix, atol = 1e-9):
+            raise ValueError('The orientation estimate changes the table-aligned rest reading of ' + sensorId + '.')
+
+#=====================================================
+# Return the rotation of one sensor, either the matrix of the table, or the rotation estimated from gravity (which is kept in the cache).
+# Returns None when the sensor is not in the table.
+#
+# sourceHash:   The hash of the file holding the accelerometer datum, used with the sensor ID to key the cache.
+# sensorId:     The ID of the sensor.
+# accData:      The columnar accelerometer datum of the sensor, or the name of its CSV file, which is only read when the rotation is not cached.
+def getSensorRotation(sourceHash, sensorId, accData):
+    if sensorId not in alignmentTable:
+        return None
+    if not estimateOrientation:
+        return alignmentTable[sensorId]
+
+    key = getCacheKey(orientationCacheVersion, sourceHash, sensorId, alignmentTable[sensorId].tolist(), quietSampleCount, referenceGravity, gravityTolerance)
+    cachedRotation = orientationCache.get(key)
+    if cachedRotation is not None:
+        return np.array(cachedRotation)
+
+    if isinstance(accData, str):
+        accData = getSensorData(accData)
+    rotation = estimateSensorRotation(accData)
+    orientationCache.put(key, rotation.tolist())
+    return rotation
+
+#=====================================================
+#CHAPTER: Functions implemented for aligning the files.
+#=====================================================
+# A function for aligning the axes of one sensor's datum to a consistent axis, with one matrix multiply over every sample.
+# The columns are the x, y and z axes of either the accelerometer or the gyroscope, so both file types are aligned the same way.
+#
+# data:         The columnar datum to be aligned.
+# rotation:     The 3x3 rotation of the sensor, where row i gives the new axis i from the original x, y and z axes.
+def alignSensorData(data, rotation):
+    aligned = data.values @ rotation.T
+    return SensorData(data.timestamps, aligned, data.columns, data.sensorId, data.sampleRate)
+
+#=====================================================
+# A function for aligning a HighG or LowG file, and writing the aligned datum to a new CSV file.
+# The gyroscope (LowG) file of a sensor uses the rotation of the accelerometer (HighG) file of the same sensor.
 #
 # filename:     The name of the file currently being aligned.
 def runAlignment(filename):
-    
-    #Return a dictionary of the CSV file datum.
-    data = getCSVDict(filename)
-    aligned = copy.deepcopy(data)
-
-    #Evaluate whether the current file is a HighG or LowG file.
-    split_file = filename.split("_")
-    gyroscopeInc = split_file[3] == 'lowg.csv'
-
-    #Following code alters the old dictionary to new alignment.
-    #If it is the left ankle, perform the following:
-    # X = Z inversed
-    # Y = Y
-    # Z = X inversed
-    if (split_file[1] == leftId):
-        for x in range(0, len(aligned)):
-            if gyroscopeInc:
-                current = float(data[x]['gz_deg/s'])
-                current = current * -1
-                aligned[x]['gx_deg/s'] = current
-
-                current = float(data[x]['gx_deg/s'])
-                current = current * -1
-                aligned[x]['gz_deg/s'] = current
-            else:
-                current = float(data[x]['az_m/s/s'])
-                current = current * -1
-                aligned[x]['ax_m/s/s'] = current
-
-                current = float(data[x]['ax_m/s/s'])
-                current = current * -1
-                aligned[x]['az_m/s/s'] = current
-
-    #If it is the right ankle, perform the following:
-    # X = Z
-    # Y = Y
-    # Z = X
-    elif (split_file[1] == rightId):
-        for x in range(0, len(aligned)):
-            if gyroscopeInc:
-                current = float(data[x]['gz_deg/s'])
-                aligned[x]['gx_deg/s'] = current
-
-                current = float(data[x]['gx_deg/s'])
-                aligned[x]['gz_deg/s'] = current
-            else:
-                current = float(data[x]['az_m/s/s'])
-                aligned[x]['ax_m/s/s'] = current
-
-                current = float(data[x]['ax_m/s/s'])
-                aligned[x]['az_m/s/s'] = current
-
-    #If it is the left ankle, perform the following:
-    # X = Y inversed
-    # Y = X inversed
-    # Z = Z inversed
-    elif (split_file[1] == pelvisId):
-        for x in range(0, len(aligned)):
-            if gyroscopeInc:
-                current = float(data[x]['gy_deg/s'])
-                current = current * -1
-                aligned[x]['gx_deg/s'] = current
-
-                current = float(data[x]['gx_deg/s'])
-                current = current * -1
-                aligned[x]['gy_deg/s'] = current
-
-                current = float(data[x]['gz_deg/s'])
-                current = current * -1
-                aligned[x]['gz_deg/s'] = current
-
-            else:
-                current = float(data[x]['ay_m/s/s'])
-                current = current * -1
-                aligned[x]['ax_m/s/s'] = current
-
-                current = float(data[x]['ax_m/s/s'])
-                current = current * -1
-                aligned[x]['ay_m/s/s'] = current
-
-                current = float(data[x]['az_m/s/s'])
-                current = current * -1
-                aligned[x]['az_m/s/s'] = current
-               
-    #If it is another file that has reached here, return out of the function.
-    else:
+    #Return the columnar datum of the CSV file.
+    fileData = getSensorData(filename)
+
+    #Get the rotation of its sensor, where a gyroscope file uses the accelerometer file of the same sensor (only read when its rotation is not cached).
+    accFilename = filename
+    accData = fileData
+    if filename.endswith("lowg.csv"):
+        accFilename = filename[:-len("lowg.csv")] + "highg.csv"
+        accData = accFilename
+    if estimateOrientation and not os.path.exists(accFilename):
+        print("ERROR: THERE IS NO ACCELEROMETER FILE TO ESTIMATE THE ORIENTATION OF " + filename)
+        return
+    try:
+        rotation = getSensorRotation(getFileHash(accFilename) if estimateOrientation else None, fileData.sensorId, accData)
+    except OrientationError as e:
+        print("ERROR: " + filename + ": " + str(e))
+        return
+    if rotation is None:
         return
     
-    #Write the new CSV file with the newly aligned dictionary.
-    writeNewCSV(filename, aligned, gyroscopeInc)
+    #Write the new CSV file with the newly aligned datum.
+    writeNewCSV(filename, alignSensorData(fileData, rotation))
+
+#=====================================================
+# A function for aligning all six streams of a session file, and writing them to a new session file.
+# The accelerometer and gyroscope streams of each sensor (i.e., [1] and [2]) use the same rotation.
+#
+# filename:     The name of the session file currently being aligned.
+def runSessionAlignment(filename):
+    group = readSession(filename)
+    sourceHash = getFileHash(filename) if estimateOrientation else None
+
+    alignedGroup = []
+    for x in range(1, 7, 2):
+        try:
+            rotation = getSensorRotation(sourceHash, group[x].sensorId, group[x])
+        except OrientationError as e:
+            print("ERROR: " + filename + ": " + str(e))
+            return
+        if rotation is None:
+            print("ERROR: THIS SESSION CONTAINS A SENSOR ID THAT DOES NOT MATCH EXPECTED VARIABLES: " + filename)
+            return
+        alignedGroup += [alignSensorData(group[x], rotation), alignSensorData(group[x + 1], rotation)]
+    writeSession(saveLocation + '\\' + filename, group[0], alignedGroup)
 
 #=====================================================
 #CHAPTER: Main Running Function of the Alignment.
@@ -154,8 +238,12 @@ def runAlignment(filename):
 print("Axes Alignment for IMU Data")
 print("------------------------------")
 
-#Get current working directory for path.
+#Get current working directory for path, and read the rotation table from it.
+#When the orientation of each sensor is estimated, first check the estimate keeps every correctly mounted sensor of the table as it is.
 currentDirectory = Path.cwd()
+alignmentTable = getAlignmentTable(alignmentFilename)
+if estimateOrientation:
+    checkOrientationEstimate()
 
 #=====================================================
 # Process for creating a new directory using the specified save location.
@@ -177,6 +265,10 @@ while(True):
     except Exception as e:
         print(e)
 
+#When the orientation of each sensor is estimated, keep the rotations in the cache of the directory.
+if estimateOrientation:
+    orientationCache = ResultCache(orientationCacheFilename)
+
 #For every file in the current directory...
 for file in os.listdir(directory):
         #Get the current filename in a directory.
@@ -186,4 +278,12 @@ for file in os.listdir(directory):
         if filename.endswith("highg.csv") or filename.endswith("lowg.csv"):
             runAlignment(filename)
             print("Aligning: " + filename)
+
+        #Session files written by the cropper are aligned as one group of streams.
+        elif filename.endswith(sessionExtension):
+            runSessionAlignment(filename)
+            print("Aligning: " + filename)
+
+if estimateOrientation:
+    orientationCache.close()
 #=====================================================
\ No newline at end of file
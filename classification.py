@@ -6,6 +6,9 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 import statistics
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from resultCache import ResultCache, getCacheKey, getFileHash
+from datasetSchema import readDatasetSchema, getViewColumns, getGroupColumns
 
 # Import sklearn key libraries required.
 from sklearn.dummy import DummyClassifier
@@ -20,7 +23,6 @@ from sklearn.neural_network import MLPClassifier
 # Import the metrics required for assessing performance.
 import sklearn.base
 from sklearn.feature_selection import SelectPercentile
-from sklearn.metrics import classification_report
 from sklearn.metrics import confusion_matrix
 from sklearn.metrics import accuracy_score
 from sklearn.model_selection import cross_validate
@@ -39,39 +41,47 @@ multiClassRows = ['Precision_2', 'Recall_2', 'F1_2']
 randomState = 1513595
 weightedScoreRows = ['Accuracy', 'Precision', 'Recall', 'F1']
 
+# Global variables for the names of the models in the same order as the row header, the number of processes
+# used to evaluate the task grid, the stratified k fold object (n = 5 for a 80/20% split), and the files, datasets
+# and evaluation contexts prepared by each process.
+modelNames = ['Dummy', 'KNN', 'GNB', 'SVC', 'GBC', 'SGD', 'RFC', 'DFF']
+workerCount = os.cpu_count()
+crossFolds = StratifiedKFold(n_splits = 5)
+fileCache = {}
+datasetCache = {}
+contextCache = {}
+
+# Global variables for keeping the result of every fold in an on-disk cache, so re-runs skip the folds that are already
+# complete for unchanged input files and settings, and an interrupted run resumes from the last completed fold.
+useResultCache = True
+resultCacheFilename = 'classificationCache.db'
+
 #=====================================================
 # The function used for writing the results to a CSV file for easier analysis and comparison between other models.
 #
 # currentScore:             The current scoring item for the label writing.
-# dummyResults:            The performance metrics of the ZeroR or Dummy Classifier.
-# knnResults:              The performance metrics for the KNN Classifier.
-# gnbResults:              The performance metrics for the GNB Classifier.
-# svcResults:              The performance metrics for the SVC Classifier.
-# gbcResults:              The performance metrics for the GBC Classifier.
-# sgdResults:              The performance metrics for the SGD Classifier.
-# rfcResults:              The performance metrics for the RFC Classifier.
-# dffResults:              The performance metrics for the DFF Classifier.
-def writeResults(currentScore, dummyResults, knnResults, gnbResults, svcResults, gbcResults, sgdResults, rfcResults, dffResults):
+# modelResults:             The performance metrics of each model, in the same order as modelNames. A model that failed is 'ERROR' instead.
+def writeResults(currentScore, modelResults):
     #Write the required score headers.
     fullScoreWriter.write('SCORE' + str(currentScore) + ',' +  rowHeader)
     weightedScoreWriter.write('SCORE' + str(currentScore) + ',' +  rowHeader)
 
     #Write the seven metrics to the new file.
     for counter in range(0, 7):
-        fullScoreWriter.write(overallScoreRows[counter] + ',' + str(dummyResults[counter]) + ',' + str(knnResults[counter]) + ',' + str(gnbResults[counter]) + ',' + str(svcResults[counter]) + ',' + str(gbcResults[counter]) + ',' + str(sgdResults[counter]) + ',' + str(rfcResults[counter]) + ',' + str(dffResults[counter]))
+        fullScoreWriter.write(overallScoreRows[counter] + ',' + getResultCells(modelResults, counter))
         fullScoreWriter.write('\n')
 
     #If the score is a multi-class classification, we need an additional loop for the metrics of a third class.
     if currentScore > 15:
         for counter in range(10, 13):
-            fullScoreWriter.write(multiClassRows[counter - 10] + ',' + str(dummyResults[counter]) + ',' + str(knnResults[counter]) + ',' + str(gnbResults[counter]) + ',' + str(svcResults[counter]) + ',' + str(gbcResults[counter]) + ',' + str(sgdResults[counter]) + ',' + str(rfcResults[counter]) + ',' + str(dffResults[counter]))
+            fullScoreWriter.write(multiClassRows[counter - 10] + ',' + getResultCells(modelResults, counter))
             fullScoreWriter.write('\n')
 
     #In the weighted result CSV file, also write these results.
-    weightedScoreWriter.write(weightedScoreRows[0] + ',' + str(dummyResults[0]) + ',' + str(knnResults[0]) + ',' + str(gnbResults[0]) + ',' + str(svcResults[0]) + ',' + str(gbcResults[0]) + ',' + str(sgdResults[0]) + ',' + str(rfcResults[0]) + ',' + str(dffResults[0]))
+    weightedScoreWriter.write(weightedScoreRows[0] + ',' + getResultCells(modelResults, 0))
     weightedScoreWriter.write('\n')
     for counter in range(7, 10):
-        weightedScoreWriter.write(weightedScoreRows[counter - 6] + ',' + str(dummyResults[counter]) + ',' + str(knnResults[counter]) + ',' + str(gnbResults[counter]) + ',' + str(svcResults[counter]) + ',' + str(gbcResults[counter]) + ',' + str(sgdResults[counter]) + ',' + str(rfcResults[counter]) + ',' + str(dffResults[counter]))
+        weightedScoreWriter.write(weightedScoreRows[counter - 6] + ',' + getResultCells(modelResults, counter))
         weightedScoreWriter.write('\n')
     fullScoreWriter.write('\n')
     weightedScoreWriter.write('\n')
@@ -80,368 +90,303 @@ def writeResults(currentScore, dummyResults, knnResults, gnbResults, svcResults,
 # A function for specifically writing the results of the total score, as there are more labels and metrics to keep track of.
 # Only the weighted metrics were output in the final product.
 #
-# currentScore:               The current scoring item for the label writing.
-# dummyResults:            The performance metrics of the ZeroR or Dummy Classifier.
-# knnResults:              The performance metrics for the KNN Classifier.
-# gnbResults:              The performance metrics for the GNB Classifier.
-# svcResults:              The performance metrics for the SVC Classifier.
-# gbcResults:              The performance metrics for the GBC Classifier.
-# sgdResults:              The performance metrics for the SGD Classifier.
-# rfcResults:              The performance metrics for the RFC Classifier.
-# dffResults:              The performance metrics for the DFF Classifier.
-def totalScoreOutput(currentScore, dummyResults, knnResults, gnbResults, svcResults, gbcResults, sgdResults, rfcResults, dffResults):
+# currentScore:             The current scoring item for the label writing.
+# modelResults:             The performance metrics of each model, in the same order as modelNames. A model that failed is 'ERROR' instead.
+def totalScoreOutput(currentScore, modelResults):
     #Replicate the other writer logic, but writing just the weighted values instead.
     weightedScoreWriter.write('SCORE' + str(currentScore) + ',' +  rowHeader)
-    weightedScoreWriter.write(weightedScoreRows[0] + ',' + str(dummyResults[0]) + ',' + str(knnResults[0]) + ',' + str(gnbResults[0]) + ',' + str(svcResults[0]) + ',' + str(gbcResults[0]) + ',' + str(sgdResults[0]) + ',' + str(rfcResults[0]) + ',' + str(dffResults[0]))
-    weightedScoreWriter.write('\n')
-    for counter in range(1, 4):
-        weightedScoreWriter.write(weightedScoreRows[counter] + ',' + str(dummyResults[counter]) + ',' + str(knnResults[counter]) + ',' + str(gnbResults[counter]) + ',' + str(svcResults[counter]) + ',' + str(gbcResults[counter]) + ',' + str(sgdResults[counter]) + ',' + str(rfcResults[counter]) + ',' + str(dffResults[counter]))
+    for counter in range(0, 4):
+        weightedScoreWriter.write(weightedScoreRows[counter] + ',' + getResultCells(modelResults, counter))
         weightedScoreWriter.write('\n')
     weightedScoreWriter.write('\n')
 
 #=====================================================
-# A general function for outputting errors to the console, in addition to the actual files too.
+# Join one metric of every model into the cells of one row, writing 'ERROR' for any model that failed.
 #
-# error:                    The error message for the console window.
-def classExceptionMessage(error):
-    print(error)
-    weightedScoreWriter.write('ERROR,')
-    fullScoreWriter.write('ERROR,ERROR,ERROR,')
+# modelResults:             The performance metrics of each model, in the same order as modelNames.
+# counter:                  The index of the metric to write.
+def getResultCells(modelResults, counter):
+    return ','.join('ERROR' if results == 'ERROR' else str(results[counter]) for results in modelResults)
 
 #=====================================================
-# Function used for validaitng one model using cross-fold validation, with 5 total folds.
+#CHAPTER: Functions implemented for evaluating the task grid of every file, subset, scoring item, model and fold.
+#=====================================================
+# Return a new, unfitted classifier for one of the model names.
 #
-# score:                    Keeping track of the current scoring item so the logic can be altered if it is multi-class.
-# cv:                       The cross validation object passed through from the original loop.
-# classifier:               The current classifier being validated.
-# XSet:                    The input data, or current subset of data to be validated.
-# ySet:                    The LESS scores to be predicted.
-def validateCurrentModel(score, cv, classifier, XSet, ySet):
-    #Set variables to be used.
-    multiClassCheck = False
-    accuraciesList = []
-    
-    #Create required lists to keep track of various metrics.
-    weightedPrecisionList = []
-    weightedRecallList = []
-    weightedF1List = []
-
-    if score != 18:
-        #All '0' classes.
-        absentPrecisionList = []
-        absentRecallList = []
-        absentF1List = []
-
-        #All '1' classes.
-        presentPrecisionList = []
-        presentRecallList = []
-        presentF1List = []
-
-        #Class names to be used in the classification report.
-        classNames = ['absent', 'present']
-        
-        #If the score is greater than 15, we need an additional set of lists for the '2' classes.
-        if score > 15:
-            classNames.append('poor')
-            multiClassCheck = True
-            poorPrecisionList = []
-            poorRecallList = []
-            poorF1List = []
-        
-        #Clone the original classifier so we aren't training the same classifier on every fold.
-        rawClassifier = sklearn.base.clone(classifier)
-
-        #Using the five splits, get the train and test sets and clone the original classifier.
-        for trainIndex, testIndex in cv.split(XSet, ySet):
-            XTrain, XTest = XSet.iloc[trainIndex], XSet.iloc[testIndex]
-            yTrain, yTest = ySet.iloc[trainIndex], ySet.iloc[testIndex]
-            classifier = sklearn.base.clone(rawClassifier)
-            
-            #Using the data extracted, fit and predict.
-            try:
-                classifier.fit(XTrain, yTrain)
-                predictions = classifier.predict(XTest)
-                
-                #Show the classification report in the console, in addition to the CSV file.
-                print(classification_report(yTest, predictions, target_names = classNames))
-                fullReport = classification_report(yTest, predictions, target_names = classNames, output_dict = True)
-
-            except Exception as e:
-                print(e)
-                return -1
-            
-            #Append all of the data from the classification report to the lists for averaging.
-            accuraciesList.append(fullReport['accuracy'])
-
-            absentPrecisionList.append(fullReport['absent']['precision'])
-            absentRecallList.append(fullReport['absent']['recall'])
-            absentF1List.append(fullReport['absent']['f1-score'])
-
-            presentPrecisionList.append(fullReport['present']['precision'])
-            presentRecallList.append(fullReport['present']['recall'])
-            presentF1List.append(fullReport['present']['f1-score'])
-
-            weightedPrecisionList.append(fullReport['weighted avg']['precision'])
-            weightedRecallList.append(fullReport['weighted avg']['recall'])
-            weightedF1List.append(fullReport['weighted avg']['f1-score'])
-
-            #If we have a multi-class scoring item, append to the additional lists too.
-            if multiClassCheck:
-                poorPrecisionList.append(fullReport['poor']['precision'])
-                poorRecallList.append(fullReport['poor']['recall'])
-                poorF1List.append(fullReport['poor']['f1-score'])
-
-        #Average all of the lists to get an average metric for 5 folds.
-        performanceMeasures = [statistics.mean(accuraciesList), 
-                                statistics.mean(absentPrecisionList), statistics.mean(absentRecallList), statistics.mean(absentF1List),
-                                statistics.mean(presentPrecisionList), statistics.mean(presentRecallList), statistics.mean(presentF1List),
-                                statistics.mean(weightedPrecisionList), statistics.mean(weightedRecallList), statistics.mean(weightedF1List)]
-        
-        #Add in the additional class if it is multi-class.
-        if multiClassCheck:
-            performanceMeasures.append(statistics.mean(poorPrecisionList))
-            performanceMeasures.append(statistics.mean(poorRecallList))
-            performanceMeasures.append(statistics.mean(poorF1List))
-    
-    #Otherwise, if it is the total score, we only extract the weighted measures.
-    else:
-        for trainIndex, testIndex in cv.split(XSet, ySet):
-            XTrain, XTest = XSet.iloc[trainIndex], XSet.iloc[testIndex]
-            yTrain, yTest = ySet.iloc[trainIndex], ySet.iloc[testIndex]
-
-            try:
-                classifier.fit(XTrain, yTrain)
-                predictions = classifier.predict(XTest)
-
-                print(classification_report(yTest, predictions))
-                fullReport = classification_report(yTest, predictions, output_dict = True)
-            except Exception as e:
-                print(e)
-                return -1
-            
-            accuraciesList.append(fullReport['accuracy'])
-
-            weightedPrecisionList.append(fullReport['weighted avg']['precision'])
-            weightedRecallList.append(fullReport['weighted avg']['recall'])
-            weightedF1List.append(fullReport['weighted avg']['f1-score'])
-
-        performanceMeasures = [statistics.mean(accuraciesList), 
-                                statistics.mean(weightedPrecisionList), statistics.mean(weightedRecallList), statistics.mean(weightedF1List)]
-
-    #Return the final instance of performance measures for output to CSV file.
-    return performanceMeasures
+# modelName:                The name of the model, as used in the row header.
+def getModel(modelName):
+    if modelName == 'Dummy':
+        return DummyClassifier(strategy = "most_frequent")
+    elif modelName == 'KNN':
+        return KNeighborsClassifier()
+    elif modelName == 'GNB':
+        return GaussianNB()
+    elif modelName == 'SVC':
+        return SVC(random_state = randomState)
+    elif modelName == 'GBC':
+        return GradientBoostingClassifier(random_state = randomState)
+    elif modelName == 'SGD':
+        return SGDClassifier(random_state = randomState)
+    elif modelName == 'RFC':
+        return RandomForestClassifier(random_state = randomState)
+    elif modelName == 'DFF':
+        return MLPClassifier(random_state = randomState)
+    raise ValueError('Unknown model: ' + modelName)
 
 #=====================================================
-# The primary function for applying all of the selected models to each scoring item accordingly.
+# Return the input data of every subset of one file as one contiguous array, with the LESS scores, the labels of the input data,
+# the positions of its columns in the file, and the schema of the file. Each process reads a file once, and keeps it for the rest of its tasks.
 #
-# X:                        The set of input data to use for training each model/
-# y:                        The LESS scores to attempt to predict.
-# crossFolds:              The consistent folds to use for the entire selection of models.
-def crossFoldClassification(X, y, crossFolds):
-    #In our dataset, 0 corresponds to scoring item 1, and 18 is the total score. The scores are in order.
-    for item in range(0, 18):
-        yZoom = y.iloc[:, item]
-        scoreStr = item + 1
-        print("SCORE" + str(scoreStr))
-        
-        #For each classifier, try to validate all of the models one after the other.
-        #ZeroR
-        try:
-            print(" ")
-            print("Dummy Classifier")
-            dummy = DummyClassifier(strategy="most_frequent")
-            dummyResults = validateCurrentModel(scoreStr, crossFolds, dummy, X, yZoom)
-        except Exception as e:
-            classExceptionMessage(e)
-        
-        #KNN
-        try:
-            print(" ")
-            print("K-Nearest Neighbours Classifier")
-            knn = KNeighborsClassifier()
-            knnResults = validateCurrentModel(scoreStr, crossFolds, knn, X, yZoom)
-        except Exception as e:
-            classExceptionMessage(e)
-        
-        #Gaussian Naive-Bayes
-        try:
-            print(" ")
-            print("Gaussian Classifier")
-            gnb = GaussianNB()
-            gnbResults = validateCurrentModel(scoreStr, crossFolds, gnb, X, yZoom)
-        except Exception as e:
-            classExceptionMessage(e)
-
-        #Support-Vector
-        try:
-            print(" ")
-            print("Support Vector Classifier")
-            svc_clf = SVC(random_state = randomState)
-            svcResults = validateCurrentModel(scoreStr, crossFolds, svc_clf, X, yZoom)
-        except Exception as e:
-            classExceptionMessage(e)
-        
-        #Gradient Boosting
-        try:
-            print(" ")
-            print("Gradient Boosting Classifier")
-            gbc = GradientBoostingClassifier(random_state = randomState)
-            gbcResults = validateCurrentModel(scoreStr, crossFolds, gbc, X, yZoom)
-        except Exception as e:
-            classExceptionMessage(e)
-        
-        #Stochastic Gradient Descent
-        try:
-            print(" ")
-            print("SGD Classifier")
-            sgd = SGDClassifier(random_state = randomState)
-            sgdResults = validateCurrentModel(scoreStr, crossFolds, sgd, X, yZoom)
-        except Exception as e:
-            classExceptionMessage(e)
+# file:                     The name of the dataset file, without the extension.
+def getDatasetFile(file):
+    if file not in fileCache:
+        scoreDataframe = pd.read_csv(file + '.csv', header = 0)
+        schema = readDatasetSchema(file + '.csv')
+        fileColumns = getViewColumns(schema, 'Full')
+        X = np.ascontiguousarray(scoreDataframe.iloc[:, fileColumns].to_numpy(dtype = np.float64))
+        y = scoreDataframe.iloc[:, getGroupColumns(schema, ['scores'])].to_numpy()
+        fileCache[file] = [X, y, [scoreDataframe.columns[x] for x in fileColumns], fileColumns, schema]
+    return fileCache[file]
 
-        #Random Forest
-        try:
-            print(" ")
-            print("Random Forest Classifier")
-            rfc = RandomForestClassifier(random_state = randomState)
-            rfcResults = validateCurrentModel(scoreStr, crossFolds, rfc, X, yZoom)
-        except Exception as e:
-            classExceptionMessage(e)
-        
-        #Multi-Layer Perception (DFF)
-        try:
-            print(" ")
-            print("Deep Feed-forward Neural Network Classification")
-            dff = MLPClassifier(random_state = randomState)
-            dffResults = validateCurrentModel(scoreStr, crossFolds, dff, X, yZoom)
-        except Exception as e:
-            classExceptionMessage(e)
-        
-        #Depending on the current scoring item, call the correct writer.
-        if item != 17:
-            if dummyResults != -1: 
-                print("Writing to output now.")
-                writeResults(scoreStr, dummyResults, knnResults, gnbResults, svcResults, gbcResults, sgdResults, rfcResults, dffResults)
+#=====================================================
+# Return the input data and the LESS scores of one file and subset, with the labels of the input data.
+# The columns of the subset are found from the column groups in the schema of the file. When they are neighbours in the array of the file
+# (i.e., the Full and Stats subsets), the input data is a view of the same array, and otherwise (i.e., the Raw subset) it is copied once.
+#
+# file:                     The name of the dataset file, without the extension.
+# subset:                   The subset of the input data (Full, Raw or Stats).
+def getDataset(file, subset):
+    if (file, subset) not in datasetCache:
+        X, y, columns, fileColumns, schema = getDatasetFile(file)
+        positions = np.searchsorted(fileColumns, getViewColumns(schema, subset))
+        if len(positions) > 0 and positions[-1] - positions[0] == len(positions) - 1:
+            subsetX = X[:, positions[0]:positions[-1] + 1]
         else:
-            if dummyResults != -1:
-                totalScoreOutput(scoreStr, dummyResults, knnResults, gnbResults, svcResults, gbcResults, sgdResults, rfcResults, dffResults)
+            subsetX = X[:, positions]
+        datasetCache[(file, subset)] = [subsetX, y, [columns[x] for x in positions]]
+    return datasetCache[(file, subset)]
 
 #=====================================================
-# The function for returning the correct subset of input data, based on the specified subset.
-def getCurrXSet(scoreDataframe, file, subset):
-    #General set up using the entire dataset.
-    X1 = scoreDataframe.iloc[:, 2:10]
-    X2 = scoreDataframe.iloc[:, 29:]
-
-    #Correctly indexing the data to get either raw, statistical or both feature types together.
-    if 'S1A2' in file:
-        if 'All' in file:
-            if 'Stats' in subset:
-                X2 = scoreDataframe.iloc[:, 29:254]
-
-            elif 'Raw' in subset:
-                X2 = scoreDataframe.iloc[:, 254:]
-
-        elif 'Ankles' in file:
-            if 'Stats' in subset:
-                X2 = scoreDataframe.iloc[:, 29:182]
-            elif 'Raw' in subset:
-                X2 = scoreDataframe.iloc[:, 182:]
-
-        elif 'Pelvis' in file:
-            if 'Stats' in subset:
-                X2 = scoreDataframe.iloc[:, 29:110]
-            elif 'Raw' in subset:
-                X2 = scoreDataframe.iloc[:, 110:]
-    
-    elif 'S2' in file:
-        if 'All' in file:
-            if 'Stats' in subset:
-                X2 = scoreDataframe.iloc[:, 29:146]
-
-            elif 'Raw' in subset:
-                X2 = scoreDataframe.iloc[:, 146:]
-
-        elif 'Ankles' in file:
-            if 'Stats' in subset:
-                X2 = scoreDataframe.iloc[:, 29:110]
-            elif 'Raw' in subset:
-                X2 = scoreDataframe.iloc[:, 110:]
-
-        elif 'Pelvis' in file:
-            if 'Stats' in subset:
-                X2 = scoreDataframe.iloc[:, 29:74]
-            elif 'Raw' in subset:
-                X2 = scoreDataframe.iloc[:, 74:]
-
-    #Concatenate the subject characteristics with the other sliced data.
-    X = pd.concat([X1, X2], axis = 1)
-
-    #Output the subset to the console for validation.
-    print("X FOR SUBSET " + subset)
-    print(X)
-    print('')
-    return X
+# The prepared evaluation of one scoring item of one dataset, shared by all of the models.
+# The input data is one contiguous array, and the train and test indices of every fold are only computed once.
+#
+# X:                        The contiguous array of input data.
+# y:                        The array of LESS scores for the scoring item.
+# score:                    The scoring item, where 18 is the total score.
+class EvaluationContext:
+    def __init__(self, X, y, score):
+        self.X = X
+        self.y = y
+        self.score = score
+        self.folds = list(crossFolds.split(X, y))
 
 #=====================================================
-#CHAPTER: Main Running Function for Classifying all of the Subsets
+# Get the evaluation context of one scoring item of one file and subset, which is only prepared the first time it is needed by each process.
+#
+# file:                     The name of the dataset file, without the extension.
+# subset:                   The subset of the input data (Full, Raw or Stats).
+# score:                    The scoring item, where 18 is the total score.
+def getEvaluationContext(file, subset, score):
+    if (file, subset, score) not in contextCache:
+        X, y, columns = getDataset(file, subset)
+        contextCache[(file, subset, score)] = EvaluationContext(X, y[:, score - 1], score)
+    return contextCache[(file, subset, score)]
+
 #=====================================================
-#Get current working directory for path
-currentDirectory = Path.cwd()
-foldersToCreate = ['weighted', 'full']
+# Derive the accuracy, and the precision, recall and F1 score of every class and their weighted averages, from one confusion matrix.
+# Classes are the labels found in either the true scores or the predictions, and follow the same rules as the classification report
+# (a metric with a zero denominator is 0, and the weighted averages use the number of true scores of each class).
+# Returns [accuracy, [precision, recall, F1] of each class..., weighted precision, weighted recall, weighted F1].
+#
+# yTest:                    The true LESS scores of the fold.
+# predictions:              The predicted LESS scores of the fold.
+# classCount:               The number of classes expected for the scoring item, or None to accept any number of classes.
+def getFoldMeasures(yTest, predictions, classCount = None):
+    labels = np.unique(np.concatenate((yTest, predictions)))
+    if classCount is not None and len(labels) != classCount:
+        raise ValueError('Number of classes, ' + str(len(labels)) + ', does not match the expected ' + str(classCount) + '.')
+    matrix = confusion_matrix(yTest, predictions, labels = labels)
+
+    #True positives are on the diagonal, true scores of each class are the rows, and predictions of each class are the columns.
+    truePositives = np.diag(matrix).astype(np.float64)
+    support = matrix.sum(axis = 1)
+    predicted = matrix.sum(axis = 0)
+    precision = np.divide(truePositives, predicted, out = np.zeros(len(labels)), where = predicted > 0)
+    recall = np.divide(truePositives, support, out = np.zeros(len(labels)), where = support > 0)
+    f1Denominator = 2 * truePositives + (support - truePositives) + (predicted - truePositives)
+    f1 = np.divide(2 * truePositives, f1Denominator, out = np.zeros(len(labels)), where = f1Denominator > 0)
+
+    foldMeasures = [float(truePositives.sum() / matrix.sum())]
+    for x in range(0, len(labels)):
+        foldMeasures += [float(precision[x]), float(recall[x]), float(f1[x])]
+    for metric in [precision, recall, f1]:
+        foldMeasures.append(float(np.average(metric, weights = support)) if support.sum() > 0 else 0.0)
+    return foldMeasures
 
 #=====================================================
-# Process for creating a new directory using the specified save location.
-# While folder input is invalid...
-while(True):
+# Function used for validating one model on one of the 5 folds of the cross-fold validation.
+# Returns the metrics of the fold in the same order as the rows written by writeResults (or totalScoreOutput for the total score),
+# or None when the model could not be fitted.
+#
+# task:                     The list of [file, subset, score, model name, fold number] to evaluate.
+def evaluateTask(task):
+    file, subset, score, modelName, fold = task
     try:
-        #Get the folder from the user, create the string using current directory and change to it.
-        folder = input("Please input the directory name you want to process: ")
-        processFolderName = str(currentDirectory) + "\\" + folder.strip()
-        directory = os.fsencode(processFolderName)
-        os.chdir(processFolderName)
-
-        for folders in foldersToCreate:
-            exists = os.path.exists(folders)
-            if not exists:
-                os.makedirs(folders)
-                print("The new directory is created!")
-        break
-        #Make a new folder so the names of the file can stay the same without overwrite.
+        context = getEvaluationContext(file, subset, score)
+
+        #Use the train and test sets of the requested fold only.
+        trainIndex, testIndex = context.folds[fold]
+        XTrain, XTest = context.X[trainIndex], context.X[testIndex]
+        yTrain, yTest = context.y[trainIndex], context.y[testIndex]
+
+        #Using the data extracted, fit and predict.
+        classifier = getModel(modelName)
+        classifier.fit(XTrain, yTrain)
+        predictions = classifier.predict(XTest)
+
+        #If it is the total score, we only extract the weighted measures.
+        if score == 18:
+            foldMeasures = getFoldMeasures(yTest, predictions)
+            return [foldMeasures[0]] + foldMeasures[-3:]
+
+        #Otherwise there are two classes ('absent' and 'present'), with an additional 'poor' class if the score is greater than 15.
+        #The weighted measures are moved before the 'poor' class, in the order of the rows in the output files.
+        foldMeasures = getFoldMeasures(yTest, predictions, 3 if score > 15 else 2)
+        if score > 15:
+            return foldMeasures[0:7] + foldMeasures[10:13] + foldMeasures[7:10]
+        return foldMeasures
+
     except Exception as e:
-        print(e)
+        print(file + ' ' + subset + ' SCORE' + str(score) + ' ' + modelName + ' fold ' + str(fold) + ': ' + str(e))
+        return None
 
-#A list of the files and subsets to run through the classification.
-availableFiles = ['fS1A2-All', 'fS1A2-Ankles', 'fS1A2-Pelvis', 'fS2-All', 'fS2-Ankles', 'fS2-Pelvis']
-availableSubsets = ['Full', 'Raw', 'Stats']
+#=====================================================
+# Return the cache key of one task, from the hash of its input file, the subset, scoring item, model name and hyperparameters,
+# and the fold with the settings of the cross-fold validation.
+#
+# task:                     The list of [file, subset, score, model name, fold number] to evaluate.
+# fileHashes:               The dictionary of the hash of each input file, by the name of the file.
+def getTaskKey(task, fileHashes):
+    file, subset, score, modelName, fold = task
+    return getCacheKey(fileHashes[file], subset, score, modelName, getModel(modelName).get_params(), fold, repr(crossFolds))
 
-#Create the stratified k fold object, with n = 5 for a 80/20% split.
-crossFolds = StratifiedKFold(n_splits = 5)
+#=====================================================
+# Average the metrics of every fold of one model, or return 'ERROR' if the model failed on any of the folds.
+#
+# foldResults:              The list of fold metrics returned by evaluateTask.
+def getModelResults(foldResults):
+    if None in foldResults:
+        return 'ERROR'
+    return [statistics.mean(measures) for measures in zip(*foldResults)]
 
-#For each of the files and the available subsets...
-for currentFile in availableFiles:
-    for currentSubset in availableSubsets:
+#=====================================================
+#CHAPTER: Main Running Function for Classifying all of the Subsets
+#=====================================================
+# As the process pool re-imports this script on Windows, the main running function is only run when the script is started directly.
+if __name__ == '__main__':
+    #Get current working directory for path
+    currentDirectory = Path.cwd()
+    foldersToCreate = ['weighted', 'full']
+
+    #=====================================================
+    # Process for creating a new directory using the specified save location.
+    # While folder input is invalid...
+    while(True):
+        try:
+            #Get the folder from the user, create the string using current directory and change to it.
+            folder = input("Please input the directory name you want to process: ")
+            processFolderName = str(currentDirectory) + "\\" + folder.strip()
+            directory = os.fsencode(processFolderName)
+            os.chdir(processFolderName)
+
+            for folders in foldersToCreate:
+                exists = os.path.exists(folders)
+                if not exists:
+                    os.makedirs(folders)
+                    print("The new directory is created!")
+            break
+            #Make a new folder so the names of the file can stay the same without overwrite.
+        except Exception as e:
+            print(e)
+
+    #A list of the files and subsets to run through the classification.
+    availableFiles = ['fS1A2-All', 'fS1A2-Ankles', 'fS1A2-Pelvis', 'fS2-All', 'fS2-Ankles', 'fS2-Pelvis']
+    availableSubsets = ['Full', 'Raw', 'Stats']
+
+    #Output every subset to the console for validation.
+    for currentFile in availableFiles:
+        for currentSubset in availableSubsets:
+            X, y, columns = getDataset(currentFile, currentSubset)
+            print("X FOR SUBSET " + currentSubset + " OF " + currentFile)
+            print(pd.DataFrame(X, columns = columns))
+            print('')
+
+    #=====================================================
+    # Expand the full grid of tasks. In our dataset, scoring items 1 to 17 are the individual items, and 18 is the total score.
+    tasks = []
+    for currentFile in availableFiles:
+        for currentSubset in availableSubsets:
+            for score in range(1, 19):
+                for modelName in modelNames:
+                    for fold in range(0, crossFolds.get_n_splits()):
+                        tasks.append((currentFile, currentSubset, score, modelName, fold))
+
+    #Use the results of any tasks that are already in the cache, and only evaluate the rest.
+    foldResults = {}
+    pendingTasks = tasks
+    if useResultCache:
+        resultCache = ResultCache(resultCacheFilename)
+        fileHashes = {currentFile: getFileHash(currentFile + '.csv') for currentFile in availableFiles}
+        taskKeys = {task: getTaskKey(task, fileHashes) for task in tasks}
+        pendingTasks = []
+        for task in tasks:
+            cachedResult = resultCache.get(taskKeys[task])
+            if cachedResult is None:
+                pendingTasks.append(task)
+            else:
+                foldResults[task] = cachedResult
+        print("Using " + str(len(foldResults)) + " cached results, evaluating " + str(len(pendingTasks)) + " tasks.")
+
+    #Evaluate every remaining task in the pool of processes, keeping the fold results by task (and in the cache) as each one finishes.
+    #Failed folds are not cached, so they are evaluated again in the next run.
+    with ProcessPoolExecutor(max_workers = workerCount) as executor:
+        futures = {executor.submit(evaluateTask, task): task for task in pendingTasks}
+        for future in as_completed(futures):
+            task = futures[future]
+            foldResults[task] = future.result()
+            if useResultCache and foldResults[task] is not None:
+                resultCache.put(taskKeys[task], foldResults[task])
+            print("Completed " + str(len(foldResults)) + " of " + str(len(tasks)) + " tasks.")
+
+    if useResultCache:
+        resultCache.close()
+
+    #=====================================================
+    # Once all tasks finish, write the results of each file and subset in the same order as before.
+    for currentFile in availableFiles:
+        for currentSubset in availableSubsets:
+            fullScoreWriter = open('full\\full_' + currentSubset + '_' + currentFile + '.csv', mode = 'w', newline = '')
+            weightedScoreWriter = open('weighted\\weighted_' + currentSubset + '_' + currentFile + '.csv', mode = 'w', newline = '')
+
+            for score in range(1, 19):
+                modelResults = []
+                for modelName in modelNames:
+                    modelResults.append(getModelResults([foldResults[(currentFile, currentSubset, score, modelName, fold)] for fold in range(0, crossFolds.get_n_splits())]))
+
+                #Depending on the current scoring item, call the correct writer.
+                if score != 18:
+                    writeResults(score, modelResults)
+                else:
+                    totalScoreOutput(score, modelResults)
+
+            #Close the current files for this specific subset.
+            fullScoreWriter.close()
+            weightedScoreWriter.close()
+        
+            #Use the console window to track the current subset.
+            print(currentSubset + " is done")
         
-        #Open the full dataset from the specified path and the two new files to write to.
-        scoreDataframe = pd.read_csv(currentFile + '.csv', header = 0)
-        fullScoreWriter = open('full\\full_' + currentSubset + '_' + currentFile + '.csv', mode = 'w', newline = '')
-        weightedScoreWriter = open('weighted\\weighted_' + currentSubset + '_' + currentFile + '.csv', mode = 'w', newline = '')
-
-        #Call the helper function to get the correct subset from the full X set, and get the scores.
-        X = getCurrXSet(scoreDataframe, currentFile, currentSubset)
-        y = scoreDataframe.iloc[:, 11:29]
-
-        #Call the classification method on the current dataset.
-        crossFoldClassification(X, y, crossFolds)
-
-        #Close the current files for this specific subset.
-        fullScoreWriter.close()
-        weightedScoreWriter.close()
-    
-        #Use the console window to track the current subset.
-        print(currentSubset + " is done")
-    
-    #Use the console window to keep track of the current file.
-    print(currentFile + " is done")
+        #Use the console window to keep track of the current file.
+        print(currentFile + " is done")
 
 #=====================================================
\ No newline at end of file
@@ -0,0 +1,123 @@
+#!"C:\Program Files\Python310"
+
+# Import libraries that are used for describing the column groups of the merged datasets.
+import csv
+import json
+import os
+import numpy as np
+
+# Global variables for the leading columns of every merged dataset, in order: the identifiers of the subject, the characteristics of the subject
+# (used as input data by every view), the jump, and the LESS scores (where TOTAL is the total score).
+identifierColumns = ['Name', 'ID']
+demographicColumns = ['Mass', 'Height', 'BMI', 'Age', 'Sex', 'Foot', 'Injury', 'Past_Injury']
+jumpColumns = ['JUMP']
+scoreColumns = ['SCORE' + str(x) for x in range(1, 18)] + ['TOTAL']
+
+# Global variables for the naming of the schema file written next to each merged dataset, and the kinds of column groups used as the input data of each view.
+schemaExtension = '.schema.json'
+viewGroups = {'Full': ['demographics', 'stats', 'raw'], 'Stats': ['demographics', 'stats'], 'Raw': ['demographics', 'raw']}
+
+#=====================================================
+#CHAPTER: Functions implemented for building the schema of a merged dataset.
+#=====================================================
+# The schema of a merged dataset lists the column groups of the file in order, each with its name and the [start, end) range of its columns:
+# identifiers:          The identifiers of the subject (Name and ID).
+# demographics:         The characteristics of the subject.
+# jump:                 The jump number.
+# scores:               The LESS scores.
+# stats_temporal:       The temporal features.
+# stats_S1_LANK:        The statistical features of each segment and sensor (i.e., segment 1 of the left ankle).
+# raw_acc, raw_gyro:    The flattened accelerometer and gyroscope points, where the sensors of each sample are side by side.
+#
+# Return the name of the column group of one column of a merged dataset.
+#
+# column:           The label of the column.
+def getColumnGroup(column):
+    if column in identifierColumns:
+        return 'identifiers'
+    elif column in demographicColumns:
+        return 'demographics'
+    elif column in jumpColumns:
+        return 'jump'
+    elif column in scoreColumns:
+        return 'scores'
+    elif column.startswith('acc-point-'):
+        return 'raw_acc'
+    elif column.startswith('gyro-point-'):
+        return 'raw_gyro'
+    elif column.startswith('S1_') or column.startswith('S2_'):
+        return 'stats_' + '_'.join(column.split('_')[:2])
+    return 'stats_temporal'
+
+#=====================================================
+# Return the schema of a merged dataset from its header, joining every run of neighbouring columns of the same group into one range.
+#
+# header:           The labels of the columns of the merged dataset.
+def getDatasetSchema(header):
+    groups = []
+    for x in range(0, len(header)):
+        name = getColumnGroup(header[x])
+        if len(groups) > 0 and groups[-1]['name'] == name:
+            groups[-1]['end'] = x + 1
+        else:
+            groups.append({'name': name, 'start': x, 'end': x + 1})
+    return {'columnCount': len(header), 'groups': groups}
+
+#=====================================================
+#CHAPTER: Functions implemented for reading and writing the schema file.
+#=====================================================
+# Return the name of the schema file of a merged dataset, i.e., fS2-All.schema.json for fS2-All.csv.
+#
+# filename:         The name of the merged dataset.
+def getSchemaFilename(filename):
+    return os.path.splitext(filename)[0] + schemaExtension
+
+#=====================================================
+# Write the schema of a merged dataset to its schema file.
+#
+# filename:         The name of the merged dataset.
+# schema:           The schema returned by getDatasetSchema.
+def writeDatasetSchema(filename, schema):
+    with open(getSchemaFilename(filename), mode = 'w') as schemaFile:
+        json.dump(schema, schemaFile, indent = 1)
+
+#=====================================================
+# Read the schema of a merged dataset from its schema file. A dataset merged before schema files were written has its schema built from its header.
+#
+# filename:         The name of the merged dataset.
+def readDatasetSchema(filename):
+    if os.path.exists(getSchemaFilename(filename)):
+        with open(getSchemaFilename(filename), mode = 'r') as schemaFile:
+            return json.load(schemaFile)
+
+    with open(filename, newline = '') as csvFile:
+        return getDatasetSchema(next(csv.reader(csvFile)))
+
+#=====================================================
+#CHAPTER: Functions implemented for the views of the input data.
+#=====================================================
+# Return the indices of the columns of a merged dataset, in the order of the file, that belong to every group of the given kinds.
+# A group belongs to a kind when it has the same name, or its name starts with the kind (i.e., stats_S2_PELV is of the kind stats).
+#
+# schema:           The schema of the merged dataset.
+# kinds:            The list of kinds of groups to include.
+def getGroupColumns(schema, kinds):
+    columns = []
+    for group in schema['groups']:
+        if any(group['name'] == kind or group['name'].startswith(kind + '_') for kind in kinds):
+            columns += range(group['start'], group['end'])
+    return np.array(sorted(columns), dtype = np.intp)
+
+#=====================================================
+# Return the indices of the columns of the input data of a subset (Full, Raw or Stats), in the order of the file.
+# As before, a subset containing Stats or Raw in its name (i.e., DRaw) uses the Stats or Raw view, and any other subset uses the Full view.
+#
+# schema:           The schema of the merged dataset.
+# subset:           The subset of the input data.
+def getViewColumns(schema, subset):
+    if 'Stats' in subset:
+        return getGroupColumns(schema, viewGroups['Stats'])
+    elif 'Raw' in subset:
+        return getGroupColumns(schema, viewGroups['Raw'])
+    return getGroupColumns(schema, viewGroups['Full'])
+#=====================================================
\ No newline at end of file
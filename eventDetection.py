@@ -0,0 +1,178 @@
+#!"C:\Program Files\Python310"
+
+# Import libraries that are used for detecting the key events of the movement.
+import numpy as np
+from imuLoader import getClosestTimestampIndex
+
+# Global variables for the physiological search windows (in microseconds) that cap how far each detector looks.
+# The maximum flight time limits the backward take-off search from initial contact, and the maximum time to flexion
+# limits the forward maximum knee flexion search from initial contact.
+maxFlightTime = 1500000
+maxTimeToFlexion = 2000000
+
+#=====================================================
+# Return the settings of the detectors, so results that depend on them (i.e., cached features) can be keyed by them.
+def getDetectionConfiguration():
+    return {'maxFlightTime': maxFlightTime, 'maxTimeToFlexion': maxTimeToFlexion}
+
+#=====================================================
+# The error raised by every detector when its key event cannot be found within the search window,
+# so the rest of the processing of that jump can be skipped.
+class EventNotFoundError(Exception):
+    pass
+
+#=====================================================
+#CHAPTER: Helper functions for the array-based detection of key events.
+#=====================================================
+# Return the first index within a search window where a condition is met, or None if it is never met.
+#
+# condition:        The boolean array of the condition over the whole datum.
+# startIndex:       The first index of the search window.
+# finalIndex:       The last index of the search window (inclusive).
+def getFirstIndex(condition, startIndex, finalIndex):
+    matches = np.flatnonzero(condition[startIndex:finalIndex + 1])
+    if len(matches) == 0:
+        return None
+    return startIndex + int(matches[0])
+
+#=====================================================
+# Return the last index within a search window where a condition is met, or None if it is never met.
+#
+# condition:        The boolean array of the condition over the whole datum.
+# startIndex:       The first index of the search window.
+# finalIndex:       The last index of the search window (inclusive).
+def getLastIndex(condition, startIndex, finalIndex):
+    matches = np.flatnonzero(condition[startIndex:finalIndex + 1])
+    if len(matches) == 0:
+        return None
+    return startIndex + int(matches[-1])
+
+#=====================================================
+# A helper function used for finding a minimum or maximum point in a selected axis, searching backward from a starting index.
+# A new minimum or maximum must be found within every 'timeout' samples, otherwise the search stops at the last one found.
+# The search window starts small and is only doubled while the search has not yet stopped, so most calls only touch a few hundred samples.
+# The search never goes past the minimum index, so it always terminates within the bounds of the event being searched for.
+#
+# minimumCheck:         Boolean value on whether this function is checking for a maximum or minimum point.
+# values:               The array of values from the axis that we want to evaluate.
+# counter:              The starting index of the backward search.
+# timeout:              The number of samples without a new minimum or maximum that stops the search.
+# minimumIndex:         The earliest index the backward search can reach.
+def detectionMaxMin(minimumCheck, values, counter, timeout = 50, minimumIndex = 0):
+    windowSize = 4 * timeout
+    while True:
+        #Reverse the window so position 0 is the starting index, and positions increase backward through the datum.
+        windowStart = max(counter - windowSize + 1, minimumIndex)
+        window = values[windowStart:counter + 1][::-1]
+
+        #Positions where the value is strictly beyond the running minimum or maximum of every earlier position.
+        if minimumCheck:
+            running = np.minimum.accumulate(window)
+            improvements = np.flatnonzero(window[1:] < running[:-1]) + 1
+        else:
+            running = np.maximum.accumulate(window)
+            improvements = np.flatnonzero(window[1:] > running[:-1]) + 1
+
+        #Only improvements within 'timeout' samples of the previous one (or of the start) are reached before the search stops.
+        gaps = np.diff(np.concatenate(([-1], improvements)))
+        stops = np.flatnonzero(gaps > timeout)
+        if len(stops) > 0:
+            improvements = improvements[:stops[0]]
+        lastPosition = int(improvements[-1]) if len(improvements) > 0 else 0
+
+        #Finish once the timeout after the last improvement fits in the window, or the window has reached the minimum index.
+        if len(stops) > 0 or lastPosition + timeout < len(window) or windowStart == minimumIndex:
+            return counter - lastPosition
+        windowSize *= 2
+
+#=====================================================
+#CHAPTER: Functions implemented for extracting relevant movement datum related to the key phases/events of the movement.
+#=====================================================
+# A function implementing the selected logic for locating initial contact within the ankle datum.
+# The first sample above the sensitivity is the main peak, and initial contact is the sample after the last one below 15m/s/s before that peak.
+# Raises EventNotFoundError when there is no peak, or no sample below 15m/s/s before it.
+#
+# fileData:         The current ankle datum (left or right) that the function is using.
+# startIndex:       The starting point within the datum to process from.
+# sensitivity:      The threshold value or sensitivity to noise.
+def getInitialContact(fileData, startIndex, sensitivity):
+    zValues = fileData['az_m/s/s']
+
+    #Find the main peak, then the start of the peak by working backward to the 15m/s/s threshold.
+    peakIndex = getFirstIndex(zValues > sensitivity, startIndex, len(zValues) - 1)
+    if peakIndex is None:
+        raise EventNotFoundError('Initial contact was not found: no peak above ' + str(sensitivity) + 'm/s/s.')
+    belowIndex = getLastIndex(zValues < 15, startIndex, peakIndex)
+    if belowIndex is None:
+        raise EventNotFoundError('Initial contact was not found: no start of the peak below 15m/s/s.')
+
+    #Return the index value, and the timestamp of initial contact.
+    return [belowIndex + 1, int(fileData.timestamps[belowIndex + 1])]
+
+#=====================================================
+# The function implemented for processing a pelvis file to locate a take-off point.
+# The minimum y-axis acceleration before initial contact is found first, and take-off is the sample after the last one above -10m/s/s before it.
+# Both searches only look back as far as the maximum flight time before initial contact, and raise EventNotFoundError otherwise.
+#
+# pelvisAccData:            The columnar pelvis accelerometer datum.
+# initialContactTimestamp:  The timestamp found in the ankle datum where initial contact takes place.
+def getInitialTakeOff(pelvisAccData, initialContactTimestamp):
+    yValues = pelvisAccData['ay_m/s/s']
+
+    #Find the ankle initial contact index within the pelvis data, and subtract 300 (to speed up processing)
+    counter = getClosestTimestampIndex(pelvisAccData, initialContactTimestamp) - 300
+    earliestIndex = max(getClosestTimestampIndex(pelvisAccData, initialContactTimestamp - maxFlightTime), 1)
+    if counter < earliestIndex:
+        raise EventNotFoundError('Take-off was not found: initial contact is too close to the start of the datum.')
+
+    #The minimum must be below zero, and the latest sample is used when the minimum value is repeated.
+    window = yValues[earliestIndex:counter + 1]
+    minimumIndex = counter - int(np.argmin(window[::-1]))
+    if yValues[minimumIndex] >= 0:
+        raise EventNotFoundError('Take-off was not found: no negative y-axis minimum within the maximum flight time.')
+
+    #Use the minimum as a starting point for finding the beginning point.
+    aboveIndex = getLastIndex(yValues >= -10, earliestIndex - 1, minimumIndex)
+    if aboveIndex is None:
+        raise EventNotFoundError('Take-off was not found: no sample above -10m/s/s within the maximum flight time.')
+
+    #Return the index, and the relevant timestamp of the take-off point together.
+    return [aboveIndex + 1, int(pelvisAccData.timestamps[aboveIndex + 1])]
+
+#=====================================================
+# Main function for extracting a relative maximum knee flexion point from the available datum.
+# Detection steps are as follows:
+# Step 0:       The first y-axis point past the selected threshold of 2m/s/s, starting 500 samples after initial contact.
+# Step 1:       The minimum in the y-axis of the pelvis, searching backward from step 0.
+# Step 2:       The maximum 'spike' in the z-axis of the pelvis, searching backward from step 1.
+# Step 3:       The final minimum in the y-axis of the pelvis, searching backward from step 2, which is maximum knee flexion.
+# Every step must stay between initial contact and 300 samples before the final index (or the maximum time to flexion, if earlier),
+# otherwise EventNotFoundError is raised.
+#
+# pelvisAccData:        The columnar pelvis accelerometer datum.
+# initialContactIndex:  The point of initial contact provided by an ankle sensor.
+# finalContactIndex:    The final index point to stop the search if nothing has been detected.
+def getMaximumKneeFlexion(pelvisAccData, initialContactIndex, finalContactIndex):
+    yValues = pelvisAccData['ay_m/s/s']
+    zValues = pelvisAccData['az_m/s/s']
+    initialContactIndex = max(initialContactIndex, 0)
+    if initialContactIndex >= len(pelvisAccData):
+        raise EventNotFoundError('Maximum knee flexion was not found: initial contact is past the end of the datum.')
+    flexionLimitIndex = getClosestTimestampIndex(pelvisAccData, int(pelvisAccData.timestamps[initialContactIndex]) + maxTimeToFlexion)
+    finalIndex = min(finalContactIndex - 300, flexionLimitIndex)
+
+    #Step 0, stepping over the fluctuating movement datum upon landing.
+    thresholdIndex = getFirstIndex(yValues > 2, initialContactIndex + 500, finalIndex)
+    if thresholdIndex is None:
+        raise EventNotFoundError('Maximum knee flexion was not found: no y-axis sample above 2m/s/s within the search window.')
+    processCounter = thresholdIndex + 1
+
+    #Steps 1 to 3, each starting from the index found by the step before it, and never searching back past initial contact.
+    for step in [[True, yValues], [False, zValues], [True, yValues]]:
+        if processCounter < initialContactIndex or processCounter > finalIndex:
+            raise EventNotFoundError('Maximum knee flexion was not found: a detection step left the search window.')
+        processCounter = detectionMaxMin(step[0], step[1], processCounter, minimumIndex = initialContactIndex)
+
+    #Returning the relevant index point of maximum knee flexion, and it's corresponding timestamp.
+    return [processCounter, int(pelvisAccData.timestamps[processCounter])]
+#=====================================================
\ No newline at end of file
@@ -0,0 +1,186 @@
+#!"C:\Program Files\Python310"
+
+# Import libraries that are used for extracting features from the segments of movement datum.
+import numpy as np
+
+# Global variable for the feature families extracted from every segment, in the order they are added for each axis.
+# Available families are statistical, spectral, jerk, peaks and zeroCrossings (see the feature registry below).
+enabledFeatureFamilies = ['statistical']
+
+# Global variables for the settings of the feature families: the frequency bands (in Hz, from the lower limit up to the upper limit)
+# of the spectral band powers, and the number of standard deviations above the mean that a local maximum must reach to be counted as a peak.
+spectralBands = [[0, 5], [5, 10], [10, 20], [20, 50], [50, 100]]
+peakThreshold = 1.0
+
+#=====================================================
+#CHAPTER: Functions implemented for the vectorised extraction of each feature family.
+#=====================================================
+# Each family takes the (samples x channels) array of a segment, the sample rate of the segment and a dictionary of intermediates
+# shared by every family of the same segment, and returns a (features x channels) array with one row for each of its feature names.
+#
+# Calculate every statistical feature of every channel of a segment at once.
+# rms:          The root mean square, related to a more weighted mean value of the data.
+# variance:     The population variance.
+# valueMean:    The mean value.
+# stdDev:       The sample standard deviation.
+# maxima:       The maximum value.
+# minima:       The minimum value.
+#
+# values:           The (samples x channels) array of the segment.
+# sampleRate:       The sample rate of the segment in Hz.
+# shared:           The dictionary of intermediates shared by the families of the segment.
+def getStatisticalFeatures(values, sampleRate, shared):
+    squaredDeviations = np.square(getDeviations(values, shared)).sum(axis = 0)
+    sampleCount = len(values)
+
+    return np.stack((np.sqrt(np.square(values).mean(axis = 0)),
+                     squaredDeviations / sampleCount,
+                     getMean(values, shared),
+                     np.sqrt(squaredDeviations / (sampleCount - 1)),
+                     values.max(axis = 0),
+                     values.min(axis = 0)))
+
+#=====================================================
+# Calculate the spectral features of every channel of a segment from one real FFT per channel (of the mean-removed values).
+# bandPower:            The power within each of the spectral bands.
+# dominantFrequency:    The frequency with the most power.
+#
+# values:           The (samples x channels) array of the segment.
+# sampleRate:       The sample rate of the segment in Hz.
+# shared:           The dictionary of intermediates shared by the families of the segment.
+def getSpectralFeatures(values, sampleRate, shared):
+    power = np.square(np.abs(np.fft.rfft(getDeviations(values, shared), axis = 0))) / len(values)
+    frequencies = np.fft.rfftfreq(len(values), 1.0 / sampleRate)
+
+    #Sum the power within each band, and find the strongest frequency after the (removed) mean.
+    features = [power[(frequencies >= band[0]) & (frequencies < band[1])].sum(axis = 0) for band in spectralBands]
+    features.append(frequencies[1 + np.argmax(power[1:], axis = 0)])
+    return np.stack(features)
+
+#=====================================================
+# Calculate the jerk features of every channel of a segment, using the difference between each sample and the sample rate.
+# jerkMean:     The mean of the absolute jerk.
+# jerkMax:      The maximum absolute jerk.
+# jerkRms:      The root mean square of the jerk.
+#
+# values:           The (samples x channels) array of the segment.
+# sampleRate:       The sample rate of the segment in Hz.
+# shared:           The dictionary of intermediates shared by the families of the segment.
+def getJerkFeatures(values, sampleRate, shared):
+    jerk = np.abs(np.diff(values, axis = 0)) * sampleRate
+    return np.stack((jerk.mean(axis = 0), jerk.max(axis = 0), np.sqrt(np.square(jerk).mean(axis = 0))))
+
+#=====================================================
+# Calculate the peak count of every channel of a segment, where a peak is a local maximum above the peak threshold.
+# peakCount:    The number of peaks.
+#
+# values:           The (samples x channels) array of the segment.
+# sampleRate:       The sample rate of the segment in Hz.
+# shared:           The dictionary of intermediates shared by the families of the segment.
+def getPeakFeatures(values, sampleRate, shared):
+    deviations = getDeviations(values, shared)
+    threshold = peakThreshold * deviations.std(axis = 0, ddof = 1)
+    peaks = (deviations[1:-1] > deviations[:-2]) & (deviations[1:-1] >= deviations[2:]) & (deviations[1:-1] > threshold)
+    return peaks.sum(axis = 0)[np.newaxis, :].astype(np.float64)
+
+#=====================================================
+# Calculate the zero crossings of every channel of a segment, where the values cross their mean (so gravity does not hide any crossings).
+# zeroCrossings:    The number of times the mean-removed values change sign.
+#
+# values:           The (samples x channels) array of the segment.
+# sampleRate:       The sample rate of the segment in Hz.
+# shared:           The dictionary of intermediates shared by the families of the segment.
+def getZeroCrossingFeatures(values, sampleRate, shared):
+    signs = np.signbit(getDeviations(values, shared))
+    return (signs[1:] != signs[:-1]).sum(axis = 0)[np.newaxis, :].astype(np.float64)
+
+#=====================================================
+#CHAPTER: Intermediates shared by the feature families of one segment.
+#=====================================================
+# Return the mean of every channel of a segment, which is only calculated once per segment.
+#
+# values:           The (samples x channels) array of the segment.
+# shared:           The dictionary of intermediates shared by the families of the segment.
+def getMean(values, shared):
+    if 'mean' not in shared:
+        shared['mean'] = values.mean(axis = 0)
+    return shared['mean']
+
+#=====================================================
+# Return the mean-removed values of every channel of a segment, which are only calculated once per segment.
+#
+# values:           The (samples x channels) array of the segment.
+# shared:           The dictionary of intermediates shared by the families of the segment.
+def getDeviations(values, shared):
+    if 'deviations' not in shared:
+        shared['deviations'] = values - getMean(values, shared)
+    return shared['deviations']
+
+#=====================================================
+#CHAPTER: Feature registry.
+#=====================================================
+# The registry of every feature family by name, with the names of its features (in the order of its rows) and the function calculating them.
+featureFamilies = {}
+
+#=====================================================
+# Add a feature family to the registry, so it can be enabled by name in enabledFeatureFamilies.
+#
+# name:             The name of the family.
+# featureNames:     The names of the features, in the same order as the rows returned by the function.
+# function:         The function calculating the features, given the values, sample rate and shared intermediates of a segment.
+def registerFeatureFamily(name, featureNames, function):
+    featureFamilies[name] = [featureNames, function]
+
+registerFeatureFamily('statistical', ['rms', 'variance', 'valueMean', 'stdDev', 'maxima', 'minima'], getStatisticalFeatures)
+registerFeatureFamily('spectral', ['bandPower_' + str(band[0]) + '_' + str(band[1]) for band in spectralBands] + ['dominantFrequency'], getSpectralFeatures)
+registerFeatureFamily('jerk', ['jerkMean', 'jerkMax', 'jerkRms'], getJerkFeatures)
+registerFeatureFamily('peaks', ['peakCount'], getPeakFeatures)
+registerFeatureFamily('zeroCrossings', ['zeroCrossings'], getZeroCrossingFeatures)
+
+#=====================================================
+#CHAPTER: Functions implemented for adding the features of a segment to the feature list.
+#=====================================================
+# Return the settings of the feature families, so results that depend on them (i.e., cached features) can be keyed by them.
+def getFeatureConfiguration():
+    return {'enabledFeatureFamilies': enabledFeatureFamilies, 'spectralBands': spectralBands, 'peakThreshold': peakThreshold}
+
+#=====================================================
+# Return the names of the features of every enabled family, in the order they are added for each axis.
+def getFeatureNames():
+    names = []
+    for family in enabledFeatureFamilies:
+        names += featureFamilies[family][0]
+    return names
+
+#=====================================================
+# Return the sample rate of a segment, estimated from the timestamps when it is not known.
+#
+# fileData:         The columnar datum of the segment.
+def getSampleRate(fileData):
+    if fileData.sampleRate is not None:
+        return fileData.sampleRate
+    return 1000000.0 / float(np.median(np.diff(fileData.timestamps)))
+
+#=====================================================
+# Add the features of every enabled family, for every axis of a segment, to a dictionary of features.
+# Each name is the label, the axis and the feature, i.e., S1_LANK_ax_m/s/s_rms, and the features of each axis are added together.
+#
+# featureStorage:           The dictionary of features to be added to.
+# dictLabel:                The label of the segment and sensor, used at the start of each name.
+# fileData:                 The columnar datum of the segment.
+def addSegmentFeatures(featureStorage, dictLabel, fileData):
+    values = np.asarray(fileData.values, dtype = np.float64)
+    if len(values) < 2:
+        raise ValueError('Features need at least two samples, but the segment has ' + str(len(values)) + '.')
+
+    #Calculate every enabled family for all of the axes at once, sharing the intermediates between the families.
+    shared = {}
+    sampleRate = getSampleRate(fileData)
+    names = getFeatureNames()
+    features = np.concatenate([featureFamilies[family][1](values, sampleRate, shared) for family in enabledFeatureFamilies])
+
+    for channel in range(0, len(fileData.columns)):
+        for feature in range(0, len(names)):
+            featureStorage[dictLabel + '_' + fileData.columns[channel] + '_' + names[feature]] = float(features[feature, channel])
+    return featureStorage
+#=====================================================
\ No newline at end of file
@@ -34,57 +34,17 @@ warnings.filterwarnings('ignore')
 import shap
 # shap.initjs()
 from sklearn.feature_selection import SelectPercentile
+from datasetSchema import readDatasetSchema, getViewColumns, getGroupColumns
 
 #=====================================================
 # The function for returning the correct subset of input data, based on the specified subset.
-def getCurrXSet(scoreDataframe, file, subset):
-    #General set up using the entire dataset.
-    X1 = scoreDataframe.iloc[:, 2:10]
-    X2 = scoreDataframe.iloc[:, 29:]
-
-    #Correctly indexing the data to get either raw, statistical or both feature types together.
-    if 'S1A2' in file:
-        if 'All' in file:
-            if 'Stats' in subset:
-                X2 = scoreDataframe.iloc[:, 29:254]
-
-            elif 'Raw' in subset:
-                X2 = scoreDataframe.iloc[:, 254:]
-
-        elif 'Ankles' in file:
-            if 'Stats' in subset:
-                X2 = scoreDataframe.iloc[:, 29:182]
-            elif 'Raw' in subset:
-                X2 = scoreDataframe.iloc[:, 182:]
-
-        elif 'Pelvis' in file:
-            if 'Stats' in subset:
-                X2 = scoreDataframe.iloc[:, 29:110]
-            elif 'Raw' in subset:
-                X2 = scoreDataframe.iloc[:, 110:]
-    
-    elif 'S2' in file:
-        if 'All' in file:
-            if 'Stats' in subset:
-                X2 = scoreDataframe.iloc[:, 29:146]
-
-            elif 'Raw' in subset:
-                X2 = scoreDataframe.iloc[:, 146:]
-
-        elif 'Ankles' in file:
-            if 'Stats' in subset:
-                X2 = scoreDataframe.iloc[:, 29:110]
-            elif 'Raw' in subset:
-                X2 = scoreDataframe.iloc[:, 110:]
-
-        elif 'Pelvis' in file:
-            if 'Stats' in subset:
-                X2 = scoreDataframe.iloc[:, 29:74]
-            elif 'Raw' in subset:
-                X2 = scoreDataframe.iloc[:, 74:]
-
-    #Concatenate the subject characteristics with the other sliced data.
-    X = pd.concat([X1, X2], axis = 1)
+# The columns of each subset are found from the column groups in the schema of the dataset, rather than fixed positions.
+#
+# scoreDataframe:           The entire merged dataset.
+# filename:                 The name of the merged dataset, used to find its schema.
+# subset:                   The subset of the input data (Full, Raw or Stats).
+def getCurrXSet(scoreDataframe, filename, subset):
+    X = scoreDataframe.iloc[:, getViewColumns(readDatasetSchema(filename), subset)]
 
     #Output the subset to the console for validation.
     print("X FOR SUBSET " + subset)
@@ -113,9 +73,9 @@ score = 1
 item = score - 1
 
 #Extract the relevant data, the same process as classification.
-scoreDataframe = pd.read_csv(fileToUse + '.csv' +  fileToUse + '.csv', header = 0)
-X = getCurrXSet(scoreDataframe, fileToUse, subsetToUse)
-y = scoreDataframe.iloc[:, 11:29]
+scoreDataframe = pd.read_csv(fileToUse + '.csv', header = 0)
+X = getCurrXSet(scoreDataframe, fileToUse + '.csv', subsetToUse)
+y = scoreDataframe.iloc[:, getGroupColumns(readDatasetSchema(fileToUse + '.csv'), ['scores'])]
 yZoom = y.iloc[:, item]
 
 #All the options of classifiers to use.
@@ -1,137 +1,182 @@
 #!"C:\Program Files\Python310"
 
 # Import libraries that are used in the filtering process.
-import csv
 import os
+import numpy as np
+from functools import lru_cache
 from pathlib import Path
 from scipy import signal
+from imuLoader import SensorData, getSensorData, writeSensorCSV
+from sessionFile import sessionExtension, readSession, writeSession
+from jumpGroups import runJumpGroups
 
 # Global variable for the directory to be created.
 saveLocation = 'filtered'
+
+# Global variables for the low-pass Butterworth filter applied to every stream: the order, and the cutoff frequency in Hz.
+filterOrder = 4
+cutoffFrequency = 100
+
+# Global variables for the mode of filtering: causal runs the filter forwards only, which delays each stream by the group delay of the filter
+# (a different delay at 1600 Hz and 1125 Hz), and zeroPhase runs it forwards and backwards so the peaks of every stream keep their timestamps.
+# Zero-phase filtering pads both edges of each stream before filtering, using the type of padding (odd, even, constant or None for no padding)
+# and the number of samples (None for the default of scipy, three times the number of filter coefficients).
+filterMode = 'causal'
+padType = 'odd'
+padLength = None
+
+# Global variable for the number of processes used to filter the files in parallel (1 filters every file in this process).
+processCount = os.cpu_count()
     
 #=====================================================
 #CHAPTER: Functions implemented for filtering the files.
 #=====================================================
-# Write the filtered values of an accelerometer or gyroscope to a new CSV file.
+# Return the second-order sections of the low-pass Butterworth filter for a sample rate, which are only designed once per process
+# for each order, cutoff and sample rate (i.e., once for every accelerometer at 1600 Hz and once for every gyroscope at 1125 Hz).
 #
-# filename:         The name of the file to create and write new values to.
-# accelerometer:    Boolean value, true when the current file is an accelerometer.
-# timestamps:       The list of timestamps from the original file.
-# xFiltered:        List of filtered acceleration datum from the x-axis.
-# yFiltered:        List of filtered acceleration datum from the y-axis.
-# zFiltered:        List of filtered acceleration datum from the z-axis.
-def writeFilteredCSV(filename, accelerometer, timestamps, xFiltered, yFiltered, zFiltered):
-    #Create a new file in the specified writer location.
-    newfile = open(saveLocation + '\\' + filename , mode='w', newline='')
-
-    #Evaluate the correct header format to write.
-    if (accelerometer):
-        header_item = ['unix_timestamp_microsec', 'ax_m/s/s', 'ay_m/s/s', 'az_m/s/s']
+# order:            The order of the filter.
+# cutoff:           The cutoff frequency of the filter in Hz.
+# sampleRate:       The sample rate of the stream in Hz.
+@lru_cache(maxsize = None)
+def getFilterCoefficients(order, cutoff, sampleRate):
+    return signal.butter(order, cutoff, 'lp', fs = sampleRate, output = 'sos')
+
+#=====================================================
+# Return a copy of the columnar datum of a stream with every axis filtered at once in the current filter mode, keeping the timestamps and details of the stream.
+#
+# fileData:         The columnar datum of the stream, with its sample rate.
+def getFilteredData(fileData):
+    sos = getFilterCoefficients(filterOrder, cutoffFrequency, float(fileData.sampleRate))
+    if filterMode == 'causal':
+        filtered = signal.sosfilt(sos, fileData.values, axis = 0)
+    elif filterMode == 'zeroPhase':
+        filtered = signal.sosfiltfilt(sos, fileData.values, axis = 0, padtype = padType, padlen = padLength)
     else:
-        header_item = ['unix_timestamp_microsec', 'gx_deg/s', 'gy_deg/s', 'gz_deg/s']
-    
-    csvwriter = csv.DictWriter(newfile, fieldnames=header_item)
-    csvwriter.writeheader()
+        raise ValueError('Unknown filter mode: ' + str(filterMode))
+    return SensorData(fileData.timestamps, filtered, fileData.columns, fileData.sensorId, fileData.sampleRate)
 
-    #Write all of the updated rows to the new file.
-    for x in range(0, len(timestamps)):
-        newfile.write(str(timestamps[x]) + ',' + str(xFiltered[x]) + ',' + str(yFiltered[x]) + ',' + str(zFiltered[x]) + '\n')
-    newfile.close()
+#=====================================================
+# Write the filtered values of an accelerometer or gyroscope to a new CSV file, with the same name in the save location.
+# As before, the header ends with \r\n and every row of values ends with \n.
+#
+# filename:         The name of the original file, which the new file keeps.
+# fileData:         The filtered columnar datum, whose columns give the header of the file.
+def writeFilteredCSV(filename, fileData):
+    writeSensorCSV(saveLocation + '\\' + filename, fileData, rowTerminator = '\n')
 
 #=====================================================
-# A function for applying the logic required for using the Butterworth filter library on all axes of a file.
+# A function for applying the Butterworth filter to all axes of a HighG (1600 Hz) or LowG (1125 Hz) file.
 #
 # filename:         The name of the file with sensor datum to be filtered.
 def runFilter(filename):
     try:
-        #Open the file in a reader object.
-        csvfile = open(filename)
-        csvreader = csv.DictReader(csvfile)
-        
-        #Setting up a default Butterworth filter for the accelerometer file (1600 Hz).
-        sos = signal.butter(4, 100, 'lp', fs = 1600, output='sos')
-        
-        #Variables created for storing values from the files.
-        timestamps = []
-        x = []
-        y = []
-        z = []
-        
-        #Evaluating whether current filename is an accelerometer...
-        if filename.endswith("highg.csv"):
-            accelerometer = True
-            #Read in all of the information from the file to the lists.
-            for data in csvreader:
-                timestamps.append(int(data['unix_timestamp_microsec']))
-                x.append(float(data['ax_m/s/s']))
-                y.append(float(data['ay_m/s/s']))
-                z.append(float(data['az_m/s/s']))
-
-        #Otherwise, the only other type of file it can be is a gyroscope file.
-        else:
-            accelerometer = False
-
-            #Replicate behaviour, but with different index labels.
-            for data in csvreader:
-                timestamps.append(int(data['unix_timestamp_microsec']))
-                x.append(float(data['gx_deg/s']))
-                y.append(float(data['gy_deg/s']))
-                z.append(float(data['gz_deg/s']))
-
-            #Overwriting the Butterworth Filter variable with the correct sample rate for a gyroscope (1125 Hz).
-            sos = signal.butter(4, 100, 'lp', fs = 1125, output='sos')
-        
-        #Apply the filter to every value in all axes lists.
-        filteredx = signal.sosfilt(sos, x)
-        filteredy = signal.sosfilt(sos, y)
-        filteredz = signal.sosfilt(sos, z)
-
-        # Write the newly filtered values to a new CSV file.
-        writeFilteredCSV(filename, accelerometer, timestamps, filteredx, filteredy, filteredz)
+        writeFilteredCSV(filename, getFilteredData(getSensorData(filename)))
 
     except Exception as e:
         print(e)
 
 #=====================================================
-#CHAPTER: Main Running Function of the Filtering.
-#=====================================================
-print("Filtering Process for IMU Data")
-print("------------------------------")
+# A function for applying the same Butterworth filter to all six streams of a session file, using the sample rate of each stream.
+#
+# filename:         The name of the session file with sensor datum to be filtered.
+def runSessionFilter(filename):
+    try:
+        group = readSession(filename)
+        filteredGroup = [getFilteredData(group[x]) for x in range(1, 7)]
 
-#Get current working directory for path
-currentDirectory = Path.cwd()
+        # Write the newly filtered streams to a new session file.
+        writeSession(saveLocation + '\\' + filename, group[0], filteredGroup)
 
-#=====================================================
-# Process for creating a new directory using the specified save location.
-# While folder input is invalid...
-while(True):
-    try:
-        #Get the folder from the user, create the string using current directory and change to it.
-        folder = input("Please input the directory name you want to process: ")
-        processFolderName = str(currentDirectory) + "\\" + folder.strip()
-        directory = os.fsencode(processFolderName)
-        os.chdir(processFolderName)
-
-        #Make a new folder so the names of the file can stay the same without overwrite.
-        exists = os.path.exists(saveLocation)
-        if not exists:
-            os.makedirs(saveLocation)
-            print("The new directory is created!")
-        break
     except Exception as e:
         print(e)
 
-#For every file in the current directory...
-for file in os.listdir(directory):
-        #Get the current filename in a directory.
+#=====================================================
+# Filter one file of the directory as a CSV file or a session file, based on its name. This is the function run for every file by the process pool.
+#
+# filename:         The name of the file to be filtered.
+def runFileFilter(filename):
+    if filename.endswith(sessionExtension):
+        runSessionFilter(filename)
+    else:
+        runFilter(filename)
+
+#=====================================================
+#CHAPTER: Filtering of live sensor feeds.
+#=====================================================
+# A causal Butterworth filter for one live stream (i.e., the accelerometer of one sensor), which filters the samples in chunks as they arrive.
+# The state of every second-order section is kept for each axis between chunks, so the filtered chunks are identical to filtering the whole
+# recorded stream at once with the causal mode. The zero-phase mode needs the whole stream, so it cannot be used for live feeds.
+#
+# sampleRate:       The sample rate of the stream in Hz.
+# channelCount:     The number of axes of the stream.
+class StreamingFilter:
+    def __init__(self, sampleRate, channelCount = 3):
+        self.sos = getFilterCoefficients(filterOrder, cutoffFrequency, float(sampleRate))
+        self.channelCount = channelCount
+        self.reset()
+
+    #=====================================================
+    # Clear the state of the filter, so the next chunk is filtered as the start of a new stream.
+    def reset(self):
+        self.state = np.zeros((self.sos.shape[0], 2, self.channelCount))
+
+    #=====================================================
+    # Filter the next chunk of samples of the stream, continuing from the state left by the previous chunk, and return the filtered values.
+    #
+    # values:           The (samples x axes) array of the new samples, which may hold any number of samples.
+    def filterChunk(self, values):
+        values = np.asarray(values, dtype = np.float64)
+        if values.ndim != 2 or values.shape[1] != self.channelCount:
+            raise ValueError('Expected chunks of ' + str(self.channelCount) + ' axes, but the chunk has shape ' + str(values.shape) + '.')
+        filtered, self.state = signal.sosfilt(self.sos, values, axis = 0, zi = self.state)
+        return filtered
+
+    #=====================================================
+    # Filter the next chunk of the columnar datum of the stream, keeping the timestamps and details of the chunk.
+    #
+    # fileData:         The columnar datum of the new samples.
+    def filterData(self, fileData):
+        return SensorData(fileData.timestamps, self.filterChunk(fileData.values), fileData.columns, fileData.sensorId, fileData.sampleRate)
+
+#=====================================================
+#CHAPTER: Main Running Function of the Filtering.
+#=====================================================
+# As the process pool re-imports this script on Windows, the main running function is only run when the script is started directly.
+if __name__ == '__main__':
+    print("Filtering Process for IMU Data")
+    print("------------------------------")
+
+    #Get current working directory for path
+    currentDirectory = Path.cwd()
+
+    #=====================================================
+    # Process for creating a new directory using the specified save location.
+    # While folder input is invalid...
+    while(True):
+        try:
+            #Get the folder from the user, create the string using current directory and change to it.
+            folder = input("Please input the directory name you want to process: ")
+            processFolderName = str(currentDirectory) + "\\" + folder.strip()
+            directory = os.fsencode(processFolderName)
+            os.chdir(processFolderName)
+
+            #Make a new folder so the names of the file can stay the same without overwrite.
+            exists = os.path.exists(saveLocation)
+            if not exists:
+                os.makedirs(saveLocation)
+                print("The new directory is created!")
+            break
+        except Exception as e:
+            print(e)
+
+    #=====================================================
+    # Find every HighG or LowG file, and every session file written by the cropper (filtered as one group of streams), in a consistent order.
+    # Then filter all of the files (in parallel when more than one process is used).
+    filenames = []
+    for file in sorted(os.listdir(directory)):
         filename = os.fsdecode(file)
-        
-        #Only when the filename is a HighG or LowG file, run the filter.
-        if filename.endswith("highg.csv") or filename.endswith("lowg.csv"):
+        if filename.endswith("highg.csv") or filename.endswith("lowg.csv") or filename.endswith(sessionExtension):
             print("Filtering: " + filename)
-            try:
-                runFilter(filename)
-            except Exception as e:
-                print(e)
-
+            filenames.append(filename)
+    runJumpGroups(runFileFilter, filenames, processCount)
 #=====================================================
\ No newline at end of file
@@ -0,0 +1,246 @@
+#!"C:\Program Files\Python310"
+
+# Import libraries that are used for loading and writing the IMU datum.
+import csv
+import numpy as np
+import pandas as pd
+
+# Global variables for the timestamp label and the axis labels of each type of IMU file.
+timestampColumn = 'unix_timestamp_microsec'
+accelerometerColumns = ['ax_m/s/s', 'ay_m/s/s', 'az_m/s/s']
+gyroscopeColumns = ['gx_deg/s', 'gy_deg/s', 'gz_deg/s']
+
+# Global variables for the sample rates of the HighG accelerometer and LowG gyroscope files.
+accelerometerSampleRate = 1600
+gyroscopeSampleRate = 1125
+
+# Global variables for the labels of the jump ID and status columns at the start of each row of a feature list,
+# and the status of a jump whose features were extracted.
+jumpIdColumn = 'jump_id'
+statusColumn = 'status'
+featureListLabelColumns = [jumpIdColumn, statusColumn]
+successStatus = 'ok'
+
+#=====================================================
+#CHAPTER: Columnar representation of the IMU datum.
+#=====================================================
+# The typed, contiguous representation of one IMU file used by every stage instead of a list of row dictionaries.
+# Timestamps are held as an int64 array, and the axis values as one (samples x columns) float array.
+# Indexing with a column label returns a view of that column, so existing code can still use fileData['ay_m/s/s'].
+#
+# timestamps:       The int64 array of timestamps, or None when the file has no timestamp column (i.e., combined files).
+# values:           The two-dimensional array of axis values, with one column per label.
+# columns:          The list of labels for each column of values.
+# sensorId:         The serial of the sensor the datum was recorded with, when it is known.
+# sampleRate:       The sample rate of the datum in Hz, when it is known.
+class SensorData:
+    def __init__(self, timestamps, values, columns, sensorId = None, sampleRate = None):
+        self.timestamps = timestamps
+        self.values = values
+        self.columns = list(columns)
+        self.columnIndex = {label: index for index, label in enumerate(self.columns)}
+        self.sensorId = sensorId
+        self.sampleRate = sampleRate
+        self.timestampIndex = None
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, label):
+        if label == timestampColumn:
+            return self.timestamps
+        return self.values[:, self.columnIndex[label]]
+
+    #=====================================================
+    # Slice the datum between a start and end index point, without copying the underlying arrays.
+    #
+    # initialIndex:     The index that needs to be sliced from.
+    # finalIndex:       The index that needs to be sliced to.
+    def crop(self, initialIndex, finalIndex):
+        timestamps = None if self.timestamps is None else self.timestamps[initialIndex:finalIndex]
+        return SensorData(timestamps, self.values[initialIndex:finalIndex], self.columns, self.sensorId, self.sampleRate)
+
+    #=====================================================
+    # Get the timestamp index of the datum, which is only built the first time it is needed.
+    def getTimestampIndex(self):
+        if self.timestampIndex is None:
+            self.timestampIndex = TimestampIndex(self.timestamps)
+        return self.timestampIndex
+
+#=====================================================
+# A sorted index of the timestamps in one stream, built once and then used for every nearest timestamp lookup with a binary search.
+# The rules of the lookup are as follows:
+# Ties:             When two timestamps are equally close, the earlier one is used. When a timestamp is repeated, its first index is used.
+# Out of range:     Timestamps before the first or after the last timestamp return the first or last index when outOfRange is 'clamp',
+#                   or raise a ValueError when outOfRange is 'raise'.
+#
+# timestamps:       The int64 array of timestamps of the stream.
+class TimestampIndex:
+    def __init__(self, timestamps):
+        timestamps = np.asarray(timestamps, dtype = np.int64)
+        if len(timestamps) == 0:
+            raise ValueError('A timestamp index cannot be built without any timestamps.')
+
+        #Recorded timestamps are already sorted, so the sort (and the index mapping back) is only needed otherwise.
+        if np.any(timestamps[1:] < timestamps[:-1]):
+            self.order = np.argsort(timestamps, kind = 'stable')
+            self.sortedTimestamps = timestamps[self.order]
+        else:
+            self.order = None
+            self.sortedTimestamps = timestamps
+
+    #=====================================================
+    # Return whether each of the timestamps is within the first and last timestamp of the stream.
+    #
+    # timestamps:       The timestamp, or array of timestamps, to check.
+    def isInRange(self, timestamps):
+        timestamps = np.asarray(timestamps, dtype = np.int64)
+        return (timestamps >= self.sortedTimestamps[0]) & (timestamps <= self.sortedTimestamps[-1])
+
+    #=====================================================
+    # Return the index positions of the closest timestamps to each of the timestamps in a batch.
+    #
+    # timestamps:       The array of timestamps that we want to find in the stream.
+    # outOfRange:       Either 'clamp' or 'raise', for timestamps outside of the stream.
+    def getClosestIndices(self, timestamps, outOfRange = 'clamp'):
+        timestamps = np.asarray(timestamps, dtype = np.int64)
+        if outOfRange == 'raise' and not np.all(self.isInRange(timestamps)):
+            raise ValueError('A timestamp is outside of the range of the stream.')
+
+        #Binary search for the first timestamp at or after each timestamp, and compare it with the one before it.
+        lastIndex = len(self.sortedTimestamps) - 1
+        after = np.minimum(np.searchsorted(self.sortedTimestamps, timestamps, side = 'left'), lastIndex)
+        before = np.maximum(after - 1, 0)
+        useBefore = np.abs(timestamps - self.sortedTimestamps[before]) <= np.abs(self.sortedTimestamps[after] - timestamps)
+        closest = np.where(useBefore, before, after)
+
+        #Move to the first index of a repeated timestamp, and map back to the original order if it had to be sorted.
+        closest = np.searchsorted(self.sortedTimestamps, self.sortedTimestamps[closest], side = 'left')
+        if self.order is not None:
+            closest = self.order[closest]
+        return closest
+
+    #=====================================================
+    # Return the index position of the closest timestamp to one timestamp.
+    #
+    # timestamp:        The timestamp that we want to find in the stream.
+    # outOfRange:       Either 'clamp' or 'raise', for a timestamp outside of the stream.
+    def getClosestIndex(self, timestamp, outOfRange = 'clamp'):
+        return int(self.getClosestIndices([timestamp], outOfRange)[0])
+
+#=====================================================
+#CHAPTER: Functions implemented for reading and writing the IMU files.
+#=====================================================
+# Get the axis labels relevant to a file, based on the IMU naming conventions.
+#
+# filename:         The name of the file to get the labels for.
+# header:           The header row of the file, used when the file is not a HighG or LowG file.
+def getAxisColumns(filename, header):
+    if filename.endswith("highg.csv"):
+        return accelerometerColumns
+    elif filename.endswith("lowg.csv"):
+        return gyroscopeColumns
+    return [label for label in header if label != timestampColumn]
+
+#=====================================================
+# Get the sensor serial and sample rate of a HighG or LowG file, based on the IMU naming conventions.
+# Other files (i.e., combined files) return None for both values.
+#
+# filename:         The name of the file to get the details for.
+def getSensorDetails(filename):
+    if filename.endswith("highg.csv"):
+        return [filename.split("_")[1], accelerometerSampleRate]
+    elif filename.endswith("lowg.csv"):
+        return [filename.split("_")[1], gyroscopeSampleRate]
+    return [None, None]
+
+#=====================================================
+# Get the columnar representation of a CSV file.
+#
+# filename:         The name of the file to read and return.
+# columns:          The axis labels to read, by default the labels relevant to the type of file.
+# dtype:            The float type of the axis values (float64 or float32).
+def getSensorData(filename, columns = None, dtype = np.float64):
+    #Read the header only, to find which columns are available.
+    with open(filename, newline = '') as csvFile:
+        header = next(csv.reader(csvFile))
+
+    if columns is None:
+        columns = getAxisColumns(filename, header)
+    hasTimestamps = timestampColumn in header
+
+    #Read only the required columns in one pass, with the types set up front.
+    #The values are parsed exactly (as float() does), so every stage that reads and rewrites a file keeps the same values.
+    useColumns = ([timestampColumn] if hasTimestamps else []) + list(columns)
+    columnTypes = {label: dtype for label in columns}
+    if hasTimestamps:
+        columnTypes[timestampColumn] = np.int64
+    frame = pd.read_csv(filename, usecols = useColumns, dtype = columnTypes, engine = 'c', float_precision = 'round_trip')
+
+    #Convert the frame into contiguous arrays.
+    timestamps = np.ascontiguousarray(frame[timestampColumn].to_numpy()) if hasTimestamps else None
+    values = np.ascontiguousarray(frame[list(columns)].to_numpy(dtype = dtype))
+    sensorDetails = getSensorDetails(filename)
+    return SensorData(timestamps, values, columns, sensorDetails[0], sensorDetails[1])
+
+#=====================================================
+# Get the jump ID and status labels, and the text of every feature cell, of a feature list, so the features can be written again
+# exactly as the segmentation wrote them (i.e., the integer temporal features stay integers, and failed jumps stay empty).
+# Returns [labels, columns, cells], where labels is the list of [jump ID, status] of every row, columns is the list of feature labels,
+# and cells is the (rows x features) array of the text of every feature cell.
+#
+# filename:         The name of the feature list to read.
+def getFeatureListText(filename):
+    with open(filename, newline = '') as csvFile:
+        rows = list(csv.reader(csvFile))
+    header = rows[0]
+    labelIndices = [header.index(label) for label in featureListLabelColumns]
+    featureIndices = [x for x in range(0, len(header)) if header[x] not in featureListLabelColumns]
+
+    cells = np.array(rows[1:], dtype = object).reshape(len(rows) - 1, len(header))
+    return [cells[:, labelIndices].tolist(), [header[x] for x in featureIndices], cells[:, featureIndices]]
+
+#=====================================================
+# Write the jump ID and status labels, and the text of the feature cells, to a new feature list, so every cell is written exactly as it was read.
+#
+# filename:         The name of the new feature list to write.
+# labels:           The list of [jump ID, status] of every row.
+# columns:          The list of feature labels.
+# cells:            The (rows x features) array of the text of every feature cell.
+def writeFeatureListText(filename, labels, columns, cells):
+    newFile = open(filename, mode = 'w', newline = '')
+    csvWriter = csv.writer(newFile)
+    csvWriter.writerow(featureListLabelColumns + columns)
+    csvWriter.writerows(labels[x] + cells[x].tolist() for x in range(0, len(labels)))
+    newFile.close()
+
+#=====================================================
+# Return the index position of the closest timestamp in the IMU datum, using the timestamp index of the datum.
+#
+# fileData:         The columnar IMU datum with timestamps to use.
+# timestamp:        The timestamp value from an IMU sensor that we want to get an event from.
+def getClosestTimestampIndex(fileData, timestamp):
+    return fileData.getTimestampIndex().getClosestIndex(timestamp)
+
+#=====================================================
+# Write a columnar representation of IMU datum to a new CSV file.
+# The header always ends with \r\n (as written by csv), and the rows end with the row terminator, so each stage keeps the line endings it always wrote.
+#
+# filename:         The name of the new file to write.
+# fileData:         The SensorData to be written, with the timestamps first when they are available.
+# rowTerminator:    The line ending of every row after the header.
+def writeSensorCSV(filename, fileData, rowTerminator = '\r\n'):
+    newFile = open(filename, mode = 'w', newline = '')
+    csvWriter = csv.writer(newFile)
+    rowWriter = csv.writer(newFile, lineterminator = rowTerminator)
+
+    #Write the header, and every row at once from the typed arrays.
+    if fileData.timestamps is None:
+        csvWriter.writerow(fileData.columns)
+        rowWriter.writerows(fileData.values.tolist())
+    else:
+        csvWriter.writerow([timestampColumn] + fileData.columns)
+        timestamps = fileData.timestamps.tolist()
+        values = fileData.values.tolist()
+        rowWriter.writerows([timestamps[x]] + values[x] for x in range(0, len(timestamps)))
+    newFile.close()
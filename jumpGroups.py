@@ -0,0 +1,123 @@
+#!"C:\Program Files\Python310"
+
+# Import libraries that are used for grouping the IMU files of each jump and running the groups in parallel.
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Global variables for the IDs of the sensors, used to place each file in the correct position of a group.
+leftAnkleId = "TS-04223"
+rightAnkleId = "TS-04204"
+pelvisId = "TS-04205"
+
+#=====================================================
+#CHAPTER: Functions implemented for grouping the files of each jump.
+#=====================================================
+# Build the list of jump groups from the HighG and LowG files of a directory. Ordering is done by the naming conventions of each IMU data file,
+# and the filenames are sorted first so the groups (and the order of any results) are the same on every platform.
+# Index values of each group are as follows:
+# Group[0]: Participant identifier.
+# Group[1]: Left Ankle Accelerometer.
+# Group[2]: Left Ankle Gyroscope.
+# Group[3]: Right Ankle Accelerometer.
+# Group[4]: Right Ankle Gyroscope.
+# Group[5]: Pelvis Accelerometer.
+# Group[6]: Pelvis Gyroscope.
+#
+# directory:        The directory to list the files of.
+def getJumpGroups(directory):
+    filenames = sorted(os.fsdecode(file) for file in os.listdir(directory))
+    groups = []
+    currentPerson = None
+
+    for filename in filenames:
+        if not (filename.endswith("highg.csv") or filename.endswith("lowg.csv")):
+            continue
+
+        try:
+            #Split filename to get ID of the current jump.
+            id = filename.split("_")
+
+            #If we get to a file with a new ID, make a new person/group to focus on.
+            if currentPerson is None or id[0] != currentPerson[0]:
+                currentPerson = [0] * 7
+                currentPerson[0] = id[0]
+                groups.append(currentPerson)
+                pelvisIndex = 0
+                rightAnkleIndex = 0
+                leftAnkleIndex = 0
+
+            #Logic for implementing the filenames into the correct positions of the array.
+            if (id[1] == leftAnkleId):
+                currentPerson[1 + leftAnkleIndex] = filename
+                leftAnkleIndex += 1
+            elif (id[1] == rightAnkleId):
+                currentPerson[3 + rightAnkleIndex] = filename
+                rightAnkleIndex += 1
+            elif (id[1] == pelvisId):
+                currentPerson[5 + pelvisIndex] = filename
+                pelvisIndex += 1
+            else:
+                print("ERROR: THIS PARTICIPANT ID DOES NOT MATCH EXPECTED VARIABLES: " + id[1])
+
+        except Exception as e:
+            print(filename + ': ' + str(e))
+            break
+
+    return groups
+
+#=====================================================
+#CHAPTER: Functions implemented for running the jump groups.
+#=====================================================
+# Run a function for every jump group, either one after another or in a pool of processes, and yield each result as soon as it is ready.
+# The results are yielded in the same order as the groups, and a group that raises an error yields None.
+# Only a few groups per process are submitted ahead of the result being yielded, so memory use does not grow with the number of groups.
+# As the processes re-import the running script on Windows, the script must only start this from within an "if __name__ == '__main__':" block.
+#
+# function:         The module level function to run for each group, which is given the group as its only argument.
+# groups:           The list of jump groups (or any other picklable item) to run the function with.
+# processCount:     The number of processes to use, where 1 runs every group in the current process.
+def iterateJumpGroups(function, groups, processCount):
+    #Run every group in the current process.
+    if processCount <= 1 or len(groups) <= 1:
+        for group in groups:
+            try:
+                yield function(group)
+            except Exception as e:
+                print(getGroupName(group) + ': ' + str(e))
+                yield None
+        return
+
+    #Otherwise keep the pool busy with a window of submitted groups, and collect the results in the order they were submitted.
+    with ProcessPoolExecutor(max_workers = processCount) as executor:
+        submitted = deque()
+        nextGroup = 0
+        for x in range(0, len(groups)):
+            while nextGroup < len(groups) and len(submitted) < 2 * processCount:
+                submitted.append(executor.submit(function, groups[nextGroup]))
+                nextGroup += 1
+            try:
+                result = submitted.popleft().result()
+            except Exception as e:
+                print(getGroupName(groups[x]) + ': ' + str(e))
+                result = None
+            yield result
+
+#=====================================================
+# Run a function for every jump group, and return the list of results once every group is complete (see iterateJumpGroups).
+#
+# function:         The module level function to run for each group, which is given the group as its only argument.
+# groups:           The list of jump groups (or any other picklable item) to run the function with.
+# processCount:     The number of processes to use, where 1 runs every group in the current process.
+def runJumpGroups(function, groups, processCount):
+    return list(iterateJumpGroups(function, groups, processCount))
+
+#=====================================================
+# Get the name of a group for writing to the console, which is the participant ID of a group of files, or the item itself (i.e., a session filename).
+#
+# group:            The jump group or item to name.
+def getGroupName(group):
+    if isinstance(group, list):
+        return str(group[0])
+    return str(group)
+#=====================================================
\ No newline at end of file
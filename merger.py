@@ -2,170 +2,383 @@
 
 # Import libraries that are used in the merging process.
 import csv
+import json
 import os
 import numpy as np
 from pathlib import Path
-import pandas as pd
+from imuLoader import getSensorData, getFeatureListText, successStatus
+from sessionFile import segmentExtension, readSessionHeader, readSessionStreams
+from datasetSchema import identifierColumns, demographicColumns, jumpColumns, scoreColumns, getDatasetSchema, writeDatasetSchema
+from resultCache import getCacheKey, getFileHash
 
-# Global variable for the directory to be created, and the list of flattened values.
+# Global variable for the directory to be created, and the files of every jump by its jump ID.
 saveLocation = 'merged'
-flattenedDataset = []
+jumpFiles = {}
 subsetInput = ""
 
+# Global variables for the columns of the scores that together make up the jump ID of each row, joined by the separator (i.e., ID 12 and JUMP 2
+# is the jump 12-2). The jump ID must be the same as the participant identifier at the start of the IMU filenames of the jump.
+scoreKeyColumns = ['ID', 'JUMP']
+scoreKeySeparator = '-'
+
+# Global variable for the endings of the combined files after the jump ID, of either segment or of both segments joined, with the longest first.
+combinedSuffixes = [phase + '-' + sensor + '-combined.csv' for phase in ['-S1', '-S2', ''] for sensor in ['acc', 'gyro']]
+
+# Global variables for only merging the jumps that are not already in an existing merged file, which are appended to it as long as they fit in its columns.
+# The hash of the scores, features and segment files of every merged row is written next to the merged file, and the file is rebuilt
+# whenever the hash of any existing row has changed (i.e., a jump was segmented again), so no row keeps outdated datum.
+incrementalMerge = True
+rowHashExtension = '.rows.json'
+
+# Global variable for the number of points each phase of a segment is resampled to before flattening, so every jump has the same number of
+# points and each point is at the same position of the phase. None keeps every sample of the segment, filling the shorter jumps with -1 values.
+# Only the segment files can be resampled, as the combined files fill the shorter sensors of each phase with -1 values.
+resampleLength = None
+
 #=====================================================
 #CHAPTER: Functions implemented for aligning the values correctly.
 #=====================================================
-# Get the dictionary representation of a CSV file.
+# Resample the values of one phase of a sensor to a fixed number of points spread evenly from its first to its last sample,
+# using linear interpolation of every channel at once. A phase without any samples is filled with -1 values.
+#
+# values:           The (samples x channels) array of the phase.
+# length:           The number of points to resample the phase to.
+def getResampledValues(values, length):
+    if len(values) == 0:
+        return np.full((length, values.shape[1]), -1.0)
+
+    #Find the two samples either side of each point, and weight them by the distance of the point between them.
+    positions = np.linspace(0, len(values) - 1, length)
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, len(values) - 1)
+    weights = (positions - lower)[:, np.newaxis]
+    return values[lower] * (1 - weights) + values[upper] * weights
+
+#=====================================================
+# Return the flattened values of the accelerometer or gyroscope streams of a segment file, as the rows of one matrix holding the sensors
+# side by side (the same layout as a combined file), where the phases of each sensor are joined in the order they are stored.
+# As each stream is stored with its exact length, only the rows after the end of the shorter sensors are filled with -1 values,
+# and when the phases are resampled to a fixed length every sensor has the same number of rows.
+#
+# streams:          The dictionary of the streams of a segment file, by name.
+# accelerometer:    Boolean value on whether to flatten the accelerometer or gyroscope streams.
+def getFlattenedStreams(streams, accelerometer):
+    if accelerometer:
+        suffix = '_acc'
+    else:
+        suffix = '_gyro'
+
+    #Group the phases of each sensor by the name of the stream without its phase (i.e., S1_LANK_acc and S2_LANK_acc are both LANK_acc).
+    sensors = {}
+    for name in streams:
+        if name.endswith(suffix):
+            values = streams[name].values
+            if resampleLength is not None:
+                values = getResampledValues(values, resampleLength)
+            sensors.setdefault(name.split('_', 1)[1], []).append(values)
+    selected = [np.concatenate(phases) for phases in sensors.values()]
+
+    combined = np.full((max(len(values) for values in selected), sum(values.shape[1] for values in selected)), -1.0)
+    column = 0
+    for values in selected:
+        combined[:len(values), column:column + values.shape[1]] = values
+        column += values.shape[1]
+
+    #Flatten ID 'C': Row-major order.
+    return combined.flatten('C')
+
+#=====================================================
+# Return the flattened accelerometer and gyroscope datum of one jump as [acc, gyro], from either its segment file or its two combined files.
+# Combined files cannot be resampled, so an error is raised when they are read with resampleLength set, rather than mixing the widths of the rows.
+#
+# files:            The list of files of the jump, which is either [segment file] or [accelerometer combined file, gyroscope combined file].
+def getFlattenedJump(files):
+    if len(files) == 1:
+        streams = readSessionStreams(files[0])[1]
+        return [getFlattenedStreams(streams, True), getFlattenedStreams(streams, False)]
+
+    if resampleLength is not None:
+        raise ValueError('The combined files ' + files[0] + ' cannot be resampled, so resampleLength must be None unless the segment files are merged.')
+
+    #Flatten ID 'C': Row-major order.
+    return [getSensorData(files[0]).values.flatten('C'), getSensorData(files[1]).values.flatten('C')]
+
+#=====================================================
+#CHAPTER: Functions implemented for joining the scores, features and datum of each jump.
+#=====================================================
+# Return a jump ID in the same form as the IMU naming conventions, without any whitespace.
+#
+# identifier:       The jump ID or participant identifier to normalise.
+def getJumpKey(identifier):
+    return str(identifier).replace(' ', '')
+
+#=====================================================
+# Return the positions of the score key columns in the header of a file, failing with the name of the file and any missing columns.
+#
+# header:           The header of the file.
+# filename:         The name of the file, used in the message of the error.
+def getKeyColumnIndices(header, filename):
+    missingColumns = [column for column in scoreKeyColumns if column not in header]
+    if len(missingColumns) > 0:
+        raise ValueError('The file ' + filename + ' is missing the jump ID columns ' + ', '.join(missingColumns) + ' (see scoreKeyColumns).')
+    return [header.index(column) for column in scoreKeyColumns]
+
+#=====================================================
+# Return the jump ID of a combined file from its filename, by removing the known ending of the segment and sensor type
+# (i.e., 12-2-S2-acc-combined.csv and 12-2-acc-combined.csv are both the jump 12-2), so a jump ID holding a dash is kept whole.
+#
+# filename:         The name of the accelerometer or gyroscope combined file.
+def getCombinedJumpKey(filename):
+    for suffix in combinedSuffixes:
+        if filename.endswith(suffix):
+            return getJumpKey(filename[:-len(suffix)])
+    return None
+
+#=====================================================
+# Return the jump ID of a row of scores, made from its score key columns.
+#
+# keyIndices:       The positions of the score key columns, returned by getKeyColumnIndices.
+# row:              The list of cells of the row.
+def getRowKey(keyIndices, row):
+    return getJumpKey(scoreKeySeparator.join(row[index] for index in keyIndices))
+
+#=====================================================
+# Read the CSV file containing the scores as given by the user, and index every row by its jump ID. Only the first row of a repeated jump ID is kept.
+# Returns [header, scoreIndex], where scoreIndex is a dictionary of the rows by jump ID in the same order as the file.
 #
-# filename: The name of the file to read and return.
-def getCSVDict(filename):
-    csvFile = open(filename)
-    csvreader = csv.DictReader(csvFile)
-    return[row for row in csvreader]
+# filename:         The name of the file of scores.
+def getScoreIndex(filename):
+    with open(filename, mode = 'r', newline = '') as scoreCSV:
+        scoreRows = csv.reader(scoreCSV)
+        header = next(scoreRows)
+        keyIndices = getKeyColumnIndices(header, filename)
+        scoreIndex = {}
+        for row in scoreRows:
+            key = getRowKey(keyIndices, row)
+            if key in scoreIndex:
+                print("Repeated scores for jump: " + key)
+            else:
+                scoreIndex[key] = row
+    return [header, scoreIndex]
 
 #=====================================================
+# Read the header and the jump ID of every row of an existing merged file.
+# Returns [header, keys], which is [None, an empty set] when the file does not exist.
+#
+# filename:         The name of the merged file.
+def getMergedKeys(filename):
+    if not os.path.exists(filename):
+        return [None, set()]
+    with open(filename, mode = 'r', newline = '') as mergedCSV:
+        mergedRows = csv.reader(mergedCSV)
+        header = next(mergedRows)
+        keyIndices = getKeyColumnIndices(header, filename)
+        return [header, set(getRowKey(keyIndices, row) for row in mergedRows)]
+
+#=====================================================
+# Return the hash of everything a merged row is made from: its row of scores, its features, the contents of its files and the resampling.
+#
+# key:              The jump ID of the row.
+# scoreIndex:       The dictionary of the rows of scores by jump ID.
+# featureIndex:     The dictionary of the row of features by jump ID.
+# featureCells:     The text of the features of every row of the feature list.
+def getRowHash(key, scoreIndex, featureIndex, featureCells):
+    return getCacheKey(scoreIndex[key], featureCells[featureIndex[key]].tolist(), [getFileHash(filename) for filename in jumpFiles[key]], resampleLength)
+
+#=====================================================
+# Read the hash of every row of an existing merged file, from the file written next to it, i.e., fS2-All.rows.json for fS2-All.csv.
+# Returns an empty dictionary when there is no such file (i.e., the file was merged before the hashes were written).
+#
+# filename:         The name of the merged file.
+def readRowHashes(filename):
+    hashFilename = os.path.splitext(filename)[0] + rowHashExtension
+    if not os.path.exists(hashFilename):
+        return {}
+    with open(hashFilename, mode = 'r') as hashFile:
+        return json.load(hashFile)
+
+#=====================================================
+# Write the hash of every row of a merged file next to it.
+#
+# filename:         The name of the merged file.
+# rowHashes:        The dictionary of the hash of every row by jump ID.
+def writeRowHashes(filename, rowHashes):
+    with open(os.path.splitext(filename)[0] + rowHashExtension, mode = 'w') as hashFile:
+        json.dump(rowHashes, hashFile, indent = 1)
+
+#=====================================================
+# Return the header items of the accelerometer and gyroscope points.
+#
+# accWidth:         The number of accelerometer points in each row.
+# gyroWidth:        The number of gyroscope points in each row.
+def getPointHeader(accWidth, gyroWidth):
+    return ['acc-point-' + str(x) for x in range(0, accWidth)] + ['gyro-point-' + str(y) for y in range(0, gyroWidth)]
+
+#=====================================================
+# Write the merged rows of a list of jumps, each made of its row of scores followed by its features and flattened datum.
+# The features are written as the text of the feature list, and the accelerometer and gyroscope blocks of every row are assembled in one matrix,
+# where the values after the end of the shorter flattened datum are left as -1 to make all rows of balanced length.
+#
+# csvWriter:        The CSV writer of the merged file.
+# keys:             The jump IDs of the rows to write, in order.
+# scoreIndex:       The dictionary of the rows of scores by jump ID.
+# featureIndex:     The dictionary of the row of features by jump ID.
+# featureCells:     The text of the features of every row of the feature list.
+# flattened:        The dictionary of the [acc, gyro] flattened datum by jump ID.
+# accWidth:         The number of accelerometer points in each row.
+# gyroWidth:        The number of gyroscope points in each row.
+def writeMergedRows(csvWriter, keys, scoreIndex, featureIndex, featureCells, flattened, accWidth, gyroWidth):
+    merged = np.full((len(keys), accWidth + gyroWidth), -1.0)
+    for x in range(0, len(keys)):
+        accValues, gyroValues = flattened[keys[x]]
+        merged[x, :len(accValues)] = accValues
+        merged[x, accWidth:accWidth + len(gyroValues)] = gyroValues
 
+    #Write every row of scores and features followed by its row of the matrix at once.
+    values = merged.tolist()
+    csvWriter.writerows(scoreIndex[keys[x]] + featureCells[featureIndex[keys[x]]].tolist() + values[x] for x in range(0, len(keys)))
+
+#=====================================================
+# Merge the scores, features and flattened datum of every jump, joined by their jump IDs rather than by the order of each file.
+# Every jump that is missing from any of them is reported and left out of the merged file.
 def runMerge():
-    #Setting up method-scope values for getting the maximum lengths of both the accelerometer, and gyroscope datum.
-    maxAcc = 0
-    maxGyro = 0
-
-    #Open the CSV file containing the scores as given by the user, and store this in a dictionary.
-    scoreCSV = open('scores_subject.csv', mode='r', newline='')
-    featureRows = getCSVDict('feature_list.csv')
-
-    #Create a new file for writing the entire dataset to.
-    newCombinedFile = open(saveLocation + '\\f' + subsetInput + '.csv', mode = 'w', newline = '')
-
-    #Hard-coded header item.
-    headerItem = ['Name','ID','Mass','Height','BMI','Age','Sex','Foot','Injury','Past_Injury','JUMP', 'SCORE1', 'SCORE2', 'SCORE3', 'SCORE4', 'SCORE5', 'SCORE6', 'SCORE7', 'SCORE8', 'SCORE9', 'SCORE10', 'SCORE11', 'SCORE12', 'SCORE13', 'SCORE14', 'SCORE15', 'SCORE16', 'SCORE17', 'TOTAL']
-    first = True
-
-    #For each specified header we want to include, write this to the first row of the new CSV file.
-    for header in headerItem:
-        #If it's the first value (Name), write without a comma.
-        if first:
-            newCombinedFile.write(header)
-            first = False
-        else:
-            newCombinedFile.write(',' + header)
+    #Index the rows of the scores and the features by their jump IDs. The jump ID and status of each row of features are not written to the merged file.
+    scoreHeader, scoreIndex = getScoreIndex('scores_subject.csv')
+    featureLabels, featureColumns, featureCells = getFeatureListText('feature_list.csv')
+    featureIndex = {getJumpKey(featureLabels[x][0]): x for x in range(0, len(featureLabels))}
 
-    #Loop through the entirety of the flattened dataset, and find the maximum length of both accelerometer and gyroscope flattened datasets.
-    for x in range(0, len(flattenedDataset)):
-        
-        #Accelerometer data is on every even row, while gyroscope datum is on the odd rows.
-        if x % 2 == 0:
-            if len(flattenedDataset[x]) > maxAcc:
-                maxAcc = len(flattenedDataset[x])
+    #Join the jumps in the order of the scores. A jump that failed segmentation has no features or segment files, so its scores are skipped.
+    joinedKeys = []
+    for key in scoreIndex:
+        if key not in featureIndex:
+            print("Missing features for jump: " + key)
+        elif featureLabels[featureIndex[key]][1] != successStatus:
+            print("Skipping failed jump: " + key)
+        elif key not in jumpFiles:
+            print("Missing segment files for jump: " + key)
         else:
-            if len(flattenedDataset[x]) > maxGyro:
-                maxGyro = len(flattenedDataset[x])
-    
-    #Now with the maximum accelerometer and gyroscope values found, fill all other rows with -1 to make all rows of balanced length.
-    for x in range(0, len(flattenedDataset)):
-
-        #Depending on the datum type, create -1 values to be inserted altogether.
-        if x % 2 == 0:
-            insertArray = [-1] * (maxAcc - len(flattenedDataset[x]))
-        else:
-            insertArray = [-1] * (maxGyro - len(flattenedDataset[x]))
-        
-        #Append the inserted array to each row.
-        flattenedDataset[x] = np.append(flattenedDataset[x], insertArray)
-
-    # For all the header items (features) in this dataset, write this to the header as well.
-    for item in featureRows[0]:
-        newCombinedFile.write(',' + str(item))
-
-    #For both the accelerometer and gyroscope data, write a number of header items.
-    for x in range(0, maxAcc):
-        newCombinedFile.write(',' + 'acc-point-' + str(x))
-    for y in range(0, maxGyro):
-        newCombinedFile.write(',' + 'gyro-point-' + str(y))
-    newCombinedFile.write('\n')
-
-    #Move to the next row of the CSV file of all participant LESS scores.
-    next(scoreCSV, None)
-
-    #Initialise variables for correct output logic to avoid multiple nested loops.
-    #dataCounter is for tracking the rows in the flattened dataset (2 rows per participant, 1 for accelerometer, 1 for gyroscope).
-    #featureCounter is for tracking the current row in the rows of features.
-    dataCounter = 0
-    featureCounter = 0
-
-    #For all the data in the scoring CSV file (ordered the same as our dataset)...
-    for data in scoreCSV:
-        #Strip the newline and return carriage characters out.
-        outputRow = data.strip('\r\n')
-
-        #For every feature item for this dataset, write this to the current row.
-        for item in featureRows[featureCounter]:
-            outputRow += ',' + str(featureRows[featureCounter][item])
-
-        #Using dataCounter, add both the accelerometer and gyroscope data to the output row.
-        for x in range(0, len(flattenedDataset[dataCounter])):
-            outputRow += ',' + str(flattenedDataset[dataCounter][x])
-        
-        #Gyroscope datum is on the next row, so add one to the dataCounter to index this.
-        dataCounter += 1
-        for x in range(0, len(flattenedDataset[dataCounter])):
-            outputRow += ',' + str(flattenedDataset[dataCounter][x])
+            joinedKeys.append(key)
+
+    #Report the jumps that have features or segment files but no scores.
+    for key in featureIndex:
+        if key not in scoreIndex:
+            print("Extra features without scores for jump: " + key)
+    for key in jumpFiles:
+        if key not in scoreIndex:
+            print("Extra segment files without scores for jump: " + key)
 
-        #Write the new output row to the new file, update the counters and write a newline.
-        newCombinedFile.write(outputRow)
-        dataCounter += 1
-        featureCounter += 1
-        newCombinedFile.write('\n')
+    #Header items of the subject characteristics and scores, as described by the dataset schema.
+    headerItem = identifierColumns + demographicColumns + jumpColumns + scoreColumns
+    featureHeader = headerItem + featureColumns
+    filename = saveLocation + '\\f' + subsetInput + '.csv'
 
+    #When the merged file already holds some of the jumps, only flatten the jumps that are new.
+    #Any existing jump whose scores, features or files have changed since it was merged is reported, and the file is rebuilt.
+    existingHeader, existingKeys = [None, set()]
+    rowHashes = {key: getRowHash(key, scoreIndex, featureIndex, featureCells) for key in joinedKeys}
+    changedKeys = []
+    if incrementalMerge:
+        existingHeader, existingKeys = getMergedKeys(filename)
+        mergedHashes = readRowHashes(filename)
+        changedKeys = [key for key in sorted(existingKeys) if key in rowHashes and mergedHashes.get(key) != rowHashes[key]]
+        for key in changedKeys:
+            print("Changed since merged: " + key)
+    newKeys = [key for key in joinedKeys if key not in existingKeys]
+    flattened = {}
+    for key in newKeys:
+        print("Merging: " + key)
+        flattened[key] = getFlattenedJump(jumpFiles[key])
+
+    #Find the maximum length of both the accelerometer and gyroscope flattened datasets.
+    maxAcc = max((len(flattened[key][0]) for key in newKeys), default = 0)
+    maxGyro = max((len(flattened[key][1]) for key in newKeys), default = 0)
+
+    #Append the new jumps when every existing jump is still joined, and the new jumps fit in the same features and columns of points.
+    #Resampled jumps must fill the columns exactly, so they are not appended to a file of jumps that were not resampled to the same length.
+    if existingHeader is not None:
+        accWidth = sum(1 for item in existingHeader if item.startswith('acc-point-'))
+        gyroWidth = sum(1 for item in existingHeader if item.startswith('gyro-point-'))
+        fitsColumns = maxAcc <= accWidth and maxGyro <= gyroWidth
+        if resampleLength is not None and len(newKeys) > 0:
+            fitsColumns = maxAcc == accWidth and maxGyro == gyroWidth
+        if len(changedKeys) == 0 and existingKeys.issubset(joinedKeys) and existingHeader == featureHeader + getPointHeader(accWidth, gyroWidth) and fitsColumns:
+            print("Appending " + str(len(newKeys)) + " new jumps to the " + str(len(existingKeys)) + " jumps already merged.")
+            newCombinedFile = open(filename, mode = 'a', newline = '')
+            writeMergedRows(csv.writer(newCombinedFile, lineterminator = '\n'), newKeys, scoreIndex, featureIndex, featureCells, flattened, accWidth, gyroWidth)
+            newCombinedFile.close()
+            writeDatasetSchema(filename, getDatasetSchema(existingHeader))
+            writeRowHashes(filename, rowHashes)
+            return
+
+        #Otherwise, the entire merged file is rebuilt with every jump.
+        print("The existing merged file does not match the joined jumps, so it is rebuilt.")
+        for key in joinedKeys:
+            if key not in flattened:
+                print("Merging: " + key)
+                flattened[key] = getFlattenedJump(jumpFiles[key])
+        maxAcc = max((len(flattened[key][0]) for key in joinedKeys), default = 0)
+        maxGyro = max((len(flattened[key][1]) for key in joinedKeys), default = 0)
+
+    #Create a new file for writing the entire dataset to, starting with the header and a number of header items for both the accelerometer and gyroscope data.
+    newCombinedFile = open(filename, mode = 'w', newline = '')
+    csvWriter = csv.writer(newCombinedFile, lineterminator = '\n')
+    csvWriter.writerow(featureHeader + getPointHeader(maxAcc, maxGyro))
+    writeMergedRows(csvWriter, joinedKeys, scoreIndex, featureIndex, featureCells, flattened, maxAcc, maxGyro)
     newCombinedFile.close()
 
+    #Write the column groups of the merged file next to it, so later stages can find each group of columns by name.
+    writeDatasetSchema(filename, getDatasetSchema(featureHeader + getPointHeader(maxAcc, maxGyro)))
+    writeRowHashes(filename, rowHashes)
+
 #=====================================================
 #CHAPTER: Main Running Function for Merging.
 #=====================================================
-print("Merging of the IMU Data and Scoring Items")
-print("-----------------------------------------")
+# As the functions of the merger are also imported on their own (i.e., by the tests), the main running function is only run when the script is started directly.
+if __name__ == '__main__':
+    print("Merging of the IMU Data and Scoring Items")
+    print("-----------------------------------------")
 
-#Get current working directory for path.
-currentDirectory = Path.cwd()
+    #Get current working directory for path.
+    currentDirectory = Path.cwd()
 
-#=====================================================
-# Process for creating a new directory using the specified save location.
-# While folder input is invalid...
-while(True):
-    try:
-        #Get the folder from the user, create the string using current directory and change to it.
-        folder = input("Please input the directory name you want to process: ")
-        processFolderName = str(currentDirectory) + "\\" + folder.strip()
-        directory = os.fsencode(processFolderName)
-        os.chdir(processFolderName)
+    #=====================================================
+    # Process for creating a new directory using the specified save location.
+    # While folder input is invalid...
+    while(True):
+        try:
+            #Get the folder from the user, create the string using current directory and change to it.
+            folder = input("Please input the directory name you want to process: ")
+            processFolderName = str(currentDirectory) + "\\" + folder.strip()
+            directory = os.fsencode(processFolderName)
+            os.chdir(processFolderName)
 
-        #Make a new folder so the names of the file can stay the same without overwrite.
-        exists = os.path.exists(saveLocation)
-        if not exists:
-            os.makedirs(saveLocation)
-            print("The new directory is created!")
+            #Make a new folder so the names of the file can stay the same without overwrite.
+            exists = os.path.exists(saveLocation)
+            if not exists:
+                os.makedirs(saveLocation)
+                print("The new directory is created!")
         
-        #Get subset to save the full dataset under the name of the current subset.
-        subsetInput = str(directory).split('/')[-1].strip("'")
-        break
-    except Exception as e:
-        print(e)
-
-#For every file in the current directory...
-for file in os.listdir(directory):
-        #Get the current filename in a directory.
-        filename = os.fsdecode(file)
-
-        #If we find a filename with the correct identifier, flatten out the dataset. 
-        if filename.endswith("gyro-combined.csv") or filename.endswith("acc-combined.csv"):
-                print("Merging: " + filename)
-                df = pd.read_csv(filename, header=0)
-                values = df.values
-
-                #Flatten ID 'C': Row-major order.
-                val = values.flatten('C')
-                flattenedDataset.append(val)
-
-#Run the merge functionality with the program-scope variables.
-runMerge()
+            #Get subset to save the full dataset under the name of the current subset.
+            subsetInput = str(directory).split('/')[-1].strip("'")
+            break
+        except Exception as e:
+            print(e)
+
+    #Find the segment file of every jump in the current directory by the participant identifier stored in it.
+    #Only when there are no segment files, the combined files (written when the segmentation has combinedOutput enabled) of every jump are found
+    #by the jump ID at the start of their filenames (i.e., P01-S2-acc-combined.csv) instead.
+    filenames = sorted(os.fsdecode(file) for file in os.listdir(directory))
+    segmentFiles = [filename for filename in filenames if filename.endswith(segmentExtension)]
+    if len(segmentFiles) > 0:
+        for filename in segmentFiles:
+            jumpFiles[getJumpKey(readSessionHeader(filename)[0]['participant'])] = [filename]
+    else:
+        for filename in filenames:
+            if filename.endswith("acc-combined.csv"):
+                gyroFilename = filename[:-len("acc-combined.csv")] + "gyro-combined.csv"
+                if gyroFilename in filenames:
+                    jumpFiles[getCombinedJumpKey(filename)] = [filename, gyroFilename]
+
+    #Run the merge functionality with the program-scope variables.
+    runMerge()
 #=====================================================
\ No newline at end of file
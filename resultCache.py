@@ -0,0 +1,90 @@
+#!"C:\Program Files\Python310"
+
+# Import libraries that are used for storing results on disk between runs.
+import hashlib
+import inspect
+import json
+import sqlite3
+import numpy as np
+
+# Global variable for the size of each block read when hashing a file.
+hashBlockSize = 1048576
+
+#=====================================================
+#CHAPTER: Persistent store of results.
+#=====================================================
+# An on-disk store of results, where each result is saved as JSON under a key as soon as it is put.
+# As every result is committed straight away, an interrupted run keeps all of the results it finished, and a later run can skip them.
+#
+# filename:         The name of the SQLite file to store the results in, which is created if it does not exist.
+class ResultCache:
+    def __init__(self, filename):
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self.connection.commit()
+
+    #=====================================================
+    # Return the result stored under a key, or None if there is no result for it.
+    #
+    # key:              The key of the result.
+    def get(self, key):
+        row = self.connection.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    #=====================================================
+    # Store a result under a key, replacing any result already stored under it.
+    #
+    # key:              The key of the result.
+    # value:            The result to store, which must be JSON serialisable.
+    def put(self, key, value):
+        self.connection.execute('INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)', (key, json.dumps(value)))
+        self.connection.commit()
+
+    #=====================================================
+    # Close the connection to the SQLite file.
+    def close(self):
+        self.connection.close()
+
+#=====================================================
+#CHAPTER: Functions implemented for building the keys of results.
+#=====================================================
+# Return a JSON form of an item of a key that is not a JSON type, which is the same on every run (unlike its string form, which can hold
+# a memory address or be shortened). Estimators are given by their class and parameters, arrays by their type, shape and the hash of their bytes,
+# NumPy scalars by their value, and classes and module level functions by their qualified name (so not lambdas or bound methods).
+# Any other item raises a TypeError.
+#
+# item:             The item that JSON cannot encode.
+def getKeyItem(item):
+    if hasattr(item, 'get_params') and not isinstance(item, type):
+        return {'estimator': type(item).__module__ + '.' + type(item).__qualname__, 'params': item.get_params(deep = False)}
+    elif isinstance(item, np.ndarray):
+        return {'ndarray': hashlib.sha256(np.ascontiguousarray(item).tobytes()).hexdigest(), 'dtype': str(item.dtype), 'shape': list(item.shape)}
+    elif isinstance(item, np.generic):
+        return item.item()
+    elif callable(item) and not inspect.ismethod(item) and '<' not in str(getattr(item, '__qualname__', '<')) and getattr(item, '__module__', None) is not None:
+        return {'name': item.__module__ + '.' + item.__qualname__}
+    raise TypeError('The cache key cannot include ' + repr(item) + ' of type ' + type(item).__name__ + ', as it has no form that is the same on every run.')
+
+#=====================================================
+# Return the key of a result from every item it depends on (i.e., input file hashes, settings and hyperparameters).
+# Items that are not JSON types (i.e., hyperparameters holding estimators or arrays) are included using getKeyItem.
+#
+# items:            The items that the result depends on, in a consistent order.
+def getCacheKey(*items):
+    return hashlib.sha256(json.dumps(items, sort_keys = True, default = getKeyItem).encode('utf-8')).hexdigest()
+
+#=====================================================
+# Return the SHA-256 hash of the contents of a file, so results are only reused while their input file is unchanged.
+#
+# filename:         The name of the file to hash.
+def getFileHash(filename):
+    fileHash = hashlib.sha256()
+    with open(filename, mode = 'rb') as hashFile:
+        block = hashFile.read(hashBlockSize)
+        while block:
+            fileHash.update(block)
+            block = hashFile.read(hashBlockSize)
+    return fileHash.hexdigest()
+#=====================================================
\ No newline at end of file
@@ -0,0 +1,149 @@
+#!"C:\Program Files\Python310"
+
+# Import libraries that are used for writing and memory-mapping the binary session files.
+import json
+import numpy as np
+from imuLoader import SensorData, getSensorData
+
+# Global variables for the session file naming, the identifying bytes at the start of each file,
+# the byte alignment of each stored array, and the names of the six streams in the group order.
+sessionExtension = '-session.imu'
+sessionMagic = b'IMUSESS1'
+sessionAlignment = 64
+sessionStreams = ['leftAnkleAcc', 'leftAnkleGyro', 'rightAnkleAcc', 'rightAnkleGyro', 'pelvisAcc', 'pelvisGyro']
+
+# Global variable for the naming of the segment files, which use the same format to hold the ragged segments of a jump,
+# with one stream for each phase, sensor and type (i.e., S1_LANK_acc) that keeps its exact length instead of any filler values.
+segmentExtension = '-segments.imu'
+
+#=====================================================
+#CHAPTER: Functions implemented for the binary session format.
+#=====================================================
+# The layout of a session file is as follows:
+# Bytes 0-7:        The identifying bytes of the format.
+# Bytes 8-15:       The length of the JSON header as a little-endian unsigned integer.
+# Header:           The JSON header with the participant ID, and for every stream the sensor ID, sample rate,
+#                   column labels, length, types and the offsets of the timestamp and value arrays.
+# Arrays:           The raw timestamp and value arrays, each starting on a 64 byte boundary after the header.
+#
+# Round a byte position up to the next multiple of the array alignment.
+#
+# position:         The byte position to round up.
+def getAlignedPosition(position):
+    return -(-position // sessionAlignment) * sessionAlignment
+
+#=====================================================
+# Write the six streams of one jump to a new session file.
+#
+# filename:         The name of the session file to create.
+# participant:      The unique identifier of the jump.
+# streams:          The list of six SensorData streams, in the same order as sessionStreams.
+def writeSession(filename, participant, streams):
+    writeSessionStreams(filename, participant, sessionStreams, streams)
+
+#=====================================================
+# Write any number of named streams of one jump to a new file of the session format, where each stream keeps its own length.
+#
+# filename:         The name of the file to create.
+# participant:      The unique identifier of the jump.
+# names:            The names of the streams, in the order they are stored.
+# streams:          The list of SensorData streams, in the same order as the names.
+def writeSessionStreams(filename, participant, names, streams):
+    #Build the header, with the offsets of each array relative to the start of the array section.
+    header = {'participant': participant, 'streams': []}
+    arrays = []
+    offset = 0
+    for x in range(0, len(names)):
+        values = np.ascontiguousarray(streams[x].values)
+        if streams[x].timestamps is None:
+            timestamps = np.zeros(len(values), dtype = np.int64)
+        else:
+            timestamps = np.ascontiguousarray(streams[x].timestamps, dtype = np.int64)
+        timestampOffset = offset
+        valueOffset = getAlignedPosition(timestampOffset + timestamps.nbytes)
+        offset = getAlignedPosition(valueOffset + values.nbytes)
+
+        header['streams'].append({'name': names[x], 'sensorId': streams[x].sensorId, 'sampleRate': streams[x].sampleRate,
+                                  'columns': streams[x].columns, 'length': len(values), 'dtype': values.dtype.str,
+                                  'timestampOffset': timestampOffset, 'valueOffset': valueOffset})
+        arrays.append([timestampOffset, timestamps])
+        arrays.append([valueOffset, values])
+
+    headerBytes = json.dumps(header).encode('utf-8')
+    dataStart = getAlignedPosition(16 + len(headerBytes))
+
+    #Write the identifying bytes, the header, and then every array at its aligned position.
+    newFile = open(filename, mode = 'wb')
+    newFile.write(sessionMagic)
+    newFile.write(len(headerBytes).to_bytes(8, 'little'))
+    newFile.write(headerBytes)
+    for array in arrays:
+        newFile.seek(dataStart + array[0])
+        newFile.write(array[1].tobytes())
+    newFile.close()
+
+#=====================================================
+# Read and check the JSON header of a session file, without reading any of the arrays.
+# Returns [header, dataStart], where dataStart is the byte position of the array section.
+#
+# filename:         The name of the session file to read.
+def readSessionHeader(filename):
+    with open(filename, mode = 'rb') as sessionFile:
+        if sessionFile.read(8) != sessionMagic:
+            raise ValueError(filename + ' is not a session file.')
+        headerLength = int.from_bytes(sessionFile.read(8), 'little')
+        header = json.loads(sessionFile.read(headerLength).decode('utf-8'))
+    return [header, getAlignedPosition(16 + headerLength)]
+
+#=====================================================
+# Read a session file, memory-mapping every stream instead of reading it into memory.
+# The result uses the same index order as a group of filenames: [0] is the participant ID, and [1] to [6] are the streams.
+#
+# filename:         The name of the session file to read.
+def readSession(filename):
+    participant, streams = readSessionStreams(filename)
+    return [participant] + list(streams.values())
+
+#=====================================================
+# Read every named stream of a file of the session format, memory-mapping each one with its own length.
+# Returns [participant, streams], where streams is a dictionary of the SensorData of each stream by name, in the order they are stored.
+#
+# filename:         The name of the file to read.
+def readSessionStreams(filename):
+    header, dataStart = readSessionHeader(filename)
+
+    #Map each of the timestamp and value arrays directly from the file.
+    streams = {}
+    for stream in header['streams']:
+        length = stream['length']
+        columns = stream['columns']
+        if length == 0:
+            timestamps = np.zeros(0, dtype = np.int64)
+            values = np.zeros((0, len(columns)), dtype = np.dtype(stream['dtype']))
+        else:
+            timestamps = np.memmap(filename, dtype = np.int64, mode = 'r', offset = dataStart + stream['timestampOffset'], shape = (length,))
+            values = np.memmap(filename, dtype = np.dtype(stream['dtype']), mode = 'r', offset = dataStart + stream['valueOffset'], shape = (length, len(columns)))
+        streams[stream['name']] = SensorData(timestamps, values, columns, stream['sensorId'], stream['sampleRate'])
+    return [header['participant'], streams]
+
+#=====================================================
+# Get the datum of one stream in a group, which is either a filename or already loaded from a session file.
+#
+# group:            The group of filenames, or the group returned by readSession.
+# index:            The index of the stream in the group (1 to 6).
+def getGroupStream(group, index):
+    if isinstance(group[index], SensorData):
+        return group[index]
+    return getSensorData(str(group[index]))
+
+#=====================================================
+# Return the name of one stream of a segment file, made of the phase, the sensor label and the type of the datum (i.e., S1_LANK_acc).
+#
+# phase:            The phase of the jump (i.e., S1, S2, or S1A2 for both phases joined together).
+# sensorLabel:      The label of the sensor, including its leading underscore (i.e., _LANK).
+# accelerometer:    Boolean value on whether the stream is an accelerometer or gyroscope.
+def getSegmentStreamName(phase, sensorLabel, accelerometer):
+    if accelerometer:
+        return phase + sensorLabel + '_acc'
+    return phase + sensorLabel + '_gyro'
+#=====================================================
\ No newline at end of file
@@ -1,273 +1,189 @@
 #!"C:\Program Files\Python310"
 
 # Import libraries that are used in the dividing process.
-import csv
 import os
+import numpy as np
 from pathlib import Path
+from imuLoader import SensorData, getSensorData, writeSensorCSV, getFeatureListText, writeFeatureListText, accelerometerColumns, gyroscopeColumns
+from sessionFile import segmentExtension, readSessionStreams, writeSessionStreams, getSegmentStreamName
 
-# Global variables for the save location.
-saveLocation = 'S2-Pelvis'
-identifier = saveLocation.split('-')
-segmentSubset = identifier[0]
-sensorSubset = identifier[1]
+# Global variable for the subsets written in one pass over the files, each saved to a new directory of the same name.
+# Each name is the segment subset (S1A2 or S2) and the sensor subset (All, Ankles or Pelvis), split by a dash.
+subsetLocations = ['S1A2-All', 'S1A2-Ankles', 'S1A2-Pelvis', 'S2-All', 'S2-Ankles', 'S2-Pelvis']
 
+# Global variables for the labels of the sensors kept in each sensor subset, and the prefix of each sensor in the header of a combined file.
+subsetSensorLabels = {'All': ['_LANK', '_RANK', '_PELV'], 'Ankles': ['_LANK', '_RANK'], 'Pelvis': ['_PELV']}
+combinedPrefixes = {'_LANK': 'l', '_RANK': 'r', '_PELV': 'p'}
+
+#=====================================================
+#CHAPTER: Functions implemented for describing each subset.
 #=====================================================
-# Get the dictionary representation of a CSV file.
+# Get the segment and sensor subset of a subset name, i.e., S2-Pelvis is [S2, Pelvis].
 #
-# filename:             The name of the file to read and return.
-def getCSVDict(filename):
-    csvFile = open(filename)
-    csvReader = csv.DictReader(csvFile)
-    return[row for row in csvReader]
+# subset:           The name of the subset.
+def getSubsetDetails(subset):
+    return subset.split('-')
 
 #=====================================================
-# Merge the two segments into one dictionary.
+# Get the phases of the jump kept in a subset, where S1A2 keeps both segments and S2 only keeps segment 2.
 #
-# segment1:         The dictionary with movement datum related to segment 1.
-# segment2:         The dictionary with movement datum related to segment 2.
-def mergeSegmentDicts(segment1, segment2):
-    fullDataset = segment1 + segment2
-    return fullDataset
+# subset:           The name of the subset.
+def getSubsetPhases(subset):
+    if getSubsetDetails(subset)[0] == 'S1A2':
+        return ['S1', 'S2']
+    return ['S2']
 
 #=====================================================
-# Function for writing the new combined files of accelerometer and gyroscope datum between segment 1 and 2.
+# Get the labels of the sensors kept in a subset, in the same order as the streams of a segment file.
 #
-# participant:      The unique identifier of a jump.
-# fileDict:         The dictionary containing sensor datum for both segments.
+# subset:           The name of the subset.
+def getSubsetSensorLabels(subset):
+    return subsetSensorLabels[getSubsetDetails(subset)[1]]
+
+#=====================================================
+# Get the correct header items of a combined file for a subset, i.e., lax_m/s/s for the x axis of the left ankle accelerometer.
+#
+# subset:           The name of the subset.
 # accelerometer:    The Boolean value depicting whether the current file is an accelerometer or gyroscope.
-def writerLoop(participant, fileDict, accelerometer):
-    #Get the correct header items and write these to the new file.
+def getSubsetHeader(subset, accelerometer):
     if accelerometer:
-        newFile = open(saveLocation + '\\' + participant +'-acc-combined.csv' , mode = 'w', newline = '')
-        if sensorSubset == 'Pelvis':
-            headerItem = ['pax_m/s/s', 'pay_m/s/s', 'paz_m/s/s']
-        elif sensorSubset == 'Ankles':
-            headerItem = ['lax_m/s/s', 'lay_m/s/s', 'laz_m/s/s', 'rax_m/s/s', 'ray_m/s/s', 'raz_m/s/s']
-        else:
-            headerItem = ['lax_m/s/s', 'lay_m/s/s', 'laz_m/s/s', 'rax_m/s/s', 'ray_m/s/s', 'raz_m/s/s', 'pax_m/s/s', 'pay_m/s/s', 'paz_m/s/s']
+        axes = accelerometerColumns
     else:
-        newFile = open(saveLocation + '\\' + participant +'-gyro-combined.csv' , mode = 'w', newline = '')
-        if sensorSubset == 'Pelvis':
-            headerItem = ['pgx_deg/s', 'pgy_deg/s', 'pgz_deg/s']
-        elif sensorSubset == 'Ankles':
-            headerItem = ['lgx_deg/s', 'lgy_deg/s', 'lgz_deg/s', 'rgx_deg/s', 'rgy_deg/s', 'rgz_deg/s']
-        else:
-            headerItem = ['lgx_deg/s', 'lgy_deg/s', 'lgz_deg/s', 'rgx_deg/s', 'rgy_deg/s', 'rgz_deg/s', 'pgx_deg/s', 'pgy_deg/s', 'pgz_deg/s']
-
-    csvWriter = csv.DictWriter(newFile, fieldnames = headerItem)
-    csvWriter.writeheader()
- 
-    #Set a list for storing the columns of data.
-    columns = []
-
-    #For each item within the headerItem...
-    for item in headerItem:
-        #Set up variables for correctly adding all the items to a list.
-        currColumn = [item]
-        rowIndex = 0
-
-        #While the row index is less than the length of the current file...
-        while rowIndex < len(fileDict):
-            #Get the value from the file dictionary.
-            currentValue = fileDict[rowIndex][item]
+        axes = gyroscopeColumns
+    return [combinedPrefixes[sensorLabel] + axis for sensorLabel in getSubsetSensorLabels(subset) for axis in axes]
 
-            #If the value is not an integer representation of -1. append to the current column list.
-            if currentValue != '-1':
-                currColumn.append(currentValue)
-            
-            #Add 1 to the row index.
-            rowIndex += 1
-        #Append the final column to our columns list.
-        columns.append(currColumn)
-
-    #Get the maximum index from the columns (between left and right ankle, and pelvis)
-    if sensorSubset == 'Pelvis':
-        max_index = len(columns[0])
-    elif sensorSubset == 'Ankles':
-        max_index = max([len(columns[0]), len(columns[3])])
-    else:
-        max_index = max([len(columns[0]), len(columns[3]), len(columns[6])])
+#=====================================================
+# Get the mask of the features of a feature list that are kept in a subset, which are the temporal features
+# and the features of every kept phase and sensor (i.e., S2_PELV_ax_m/s/s_rms).
+#
+# columns:          The feature labels of the feature list.
+# subset:           The name of the subset.
+def getFeatureMask(columns, subset):
+    prefixes = tuple(phase + sensorLabel + '_' for phase in getSubsetPhases(subset) for sensorLabel in getSubsetSensorLabels(subset))
+    return np.array([('time' in column) or column.startswith(prefixes) for column in columns], dtype = bool)
 
-    #For all the columns, now we fill the new merged segments with -1 as the dataset must still be the same length.
-    for column in columns:
-        for x in range(len(column), max_index):
-            column.append('-1')
-    
-    #Now with additional rows, use a list to store dictionary entries of an entire row of data.
-    rows = []
-    for x in range(1, max_index):
-        currentRow = {}
-        for column in columns:
-            currentRow[column[0]] = column[x]
-        rows.append(currentRow)
+#=====================================================
+#CHAPTER: Functions implemented for writing every subset from one read of each file.
+#=====================================================
+# Function for writing the ragged segment file of one jump for every subset, with only the streams of each subset.
+# Each stream is kept at its own length, so no filler values need to be stripped or added. For the S1A2 subsets, both segments
+# of each sensor are kept as their own streams, so the merger can join them or time-normalise each phase by itself.
+#
+# filename:         The name of the segment file written by the segmentation.
+def subsetSegmentFile(filename):
+    participant, streams = readSessionStreams(filename)
 
-    #For each row in the found rows, write this to the new file.
-    for row in rows:
-        csvWriter.writerow(row)
+    for subset in subsetLocations:
+        names = []
+        for sensorLabel in getSubsetSensorLabels(subset):
+            for phase in getSubsetPhases(subset):
+                names += [getSegmentStreamName(phase, sensorLabel, True), getSegmentStreamName(phase, sensorLabel, False)]
+        writeSessionStreams(subset + '\\' + filename, participant, names, [streams[name] for name in names])
 
 #=====================================================
-# A function purely for the S1A2 merging and organising in a new directory.
+# Function for taking the entire dataset with all segments of features, and writing the features of every subset.
+# The feature list is read once as text, and the cells of each subset are taken using its precomputed mask of the columns,
+# so every feature is written exactly as the segmentation wrote it.
 #
-# accS1:                A list of the filenames relevant to accelerometer data in segment 1.
-# accS2:                A list of the filenames relevant to accelerometer data in segment 2.
-# gyroS1:               A list of the filenames relevant to gyroscope data in segment 1.
-# gyroS2:               A list of the filenames relevant to gyroscope data in segment 2.
-def runFinalSegmentMerge(accS1, accS2, gyroS1, gyroS2):
-    #For all of the filenames we have in accData...
-    for accData in range(0, len(accS1)):
-        #Get the file dictionaries from the filenames found.
-        fileDictS1 = getCSVDict(accS1[accData])
-        fileDictS2 = getCSVDict(accS2[accData])
-
-        #Merge the two dictionaries using the correct logic.
-        merged = mergeSegmentDicts(fileDictS1, fileDictS2)
+# filename:             The name of the feature list to read.
+def subsetFeatureData(filename):
+    labels, featureColumns, cells = getFeatureListText(filename)
+    for subset in subsetLocations:
+        mask = getFeatureMask(featureColumns, subset)
+        columns = [featureColumns[x] for x in np.flatnonzero(mask)]
 
-        #Split the filename by a dash.
-        data = accS1[accData].split('-')
-        
-        #Write the new accelerometer file with correct participant ID.
-        writerLoop(data[0] + '-' + data[1], merged, True)
+        #Write the features to the new file with the jump ID and status of every row.
+        writeFeatureListText(subset + '\\' + filename, labels, columns, cells[:, mask])
 
-    #Replicate the same process as the Accelerometer datum, but now with the gyroscope.
-    for gyroData in range(0, len(gyroS1)):
-        fileDictS1 = getCSVDict(gyroS1[gyroData])
-        fileDictS2 = getCSVDict(gyroS2[gyroData])
-        merged = mergeSegmentDicts(fileDictS1, fileDictS2)
-        data = gyroS1[gyroData].split('-')
-        writerLoop(data[0] + '-' + data[1], merged, False)
+#=====================================================
+#CHAPTER: Functions implemented for the combined files of older segmentation runs.
+#=====================================================
+# Return the datum of the columns of a combined file that are kept in a subset.
+#
+# fileData:         The datum of the combined file.
+# subset:           The name of the subset.
+# accelerometer:    The Boolean value depicting whether the current file is an accelerometer or gyroscope.
+def getSubsetColumns(fileData, subset, accelerometer):
+    headerItem = getSubsetHeader(subset, accelerometer)
+    return SensorData(None, fileData.values[:, [fileData.columnIndex[item] for item in headerItem]], headerItem)
 
 #=====================================================
-# A function used for subsetting the raw datum into subsets, primarily involving the sensor subset and called when the current subset is S2. 
+# Merge the two segments into one set of datum.
 #
-# filename:                 Current filename we are focused on.
-# accelerometer:            Boolean value depicting whether the current file is an accelerometer or not.
-def subsetRawData(filename, accelerometer):
-    #Get the dictionary and open a new file to write to.
-    fileDict = getCSVDict(filename)
-    newfile = open(saveLocation + '\\' + filename, mode='w', newline='')
+# segment1:         The datum related to segment 1.
+# segment2:         The datum related to segment 2.
+def mergeSegmentDicts(segment1, segment2):
+    fullDataset = SensorData(None, np.concatenate((segment1.values, segment2.values)), segment1.columns)
+    return fullDataset
 
-    #Logic required using the sensor subset for the correct headers.
+#=====================================================
+# Function for writing the new combined files of accelerometer and gyroscope datum between segment 1 and 2.
+#
+# subset:           The name of the subset.
+# participant:      The unique identifier of a jump.
+# fileData:         The datum containing sensor values for both segments, with only the columns of the subset.
+# accelerometer:    The Boolean value depicting whether the current file is an accelerometer or gyroscope.
+def writerLoop(subset, participant, fileData, accelerometer):
     if accelerometer:
-        if sensorSubset == 'Pelvis':
-            headerItem = ['pax_m/s/s', 'pay_m/s/s', 'paz_m/s/s']
-        elif sensorSubset == 'Ankles':
-            headerItem = ['lax_m/s/s', 'lay_m/s/s', 'laz_m/s/s', 'rax_m/s/s', 'ray_m/s/s', 'raz_m/s/s']
-        else:
-            headerItem = ['lax_m/s/s', 'lay_m/s/s', 'laz_m/s/s', 'rax_m/s/s', 'ray_m/s/s', 'raz_m/s/s', 'pax_m/s/s', 'pay_m/s/s', 'paz_m/s/s']
+        newFilename = subset + '\\' + participant +'-acc-combined.csv'
     else:
-        if sensorSubset == 'Pelvis':
-            headerItem = ['pgx_deg/s', 'pgy_deg/s', 'pgz_deg/s']
-        elif sensorSubset == 'Ankles':
-            headerItem = ['lgx_deg/s', 'lgy_deg/s', 'lgz_deg/s', 'rgx_deg/s', 'rgy_deg/s', 'rgz_deg/s']
-        else:
-            headerItem = ['lgx_deg/s', 'lgy_deg/s', 'lgz_deg/s', 'rgx_deg/s', 'rgy_deg/s', 'rgz_deg/s', 'pgx_deg/s', 'pgy_deg/s', 'pgz_deg/s']
-    
-    #Write the correct header to the new file.
-    csvwriter = csv.DictWriter(newfile, fieldnames = headerItem)
-    csvwriter.writeheader()
+        newFilename = subset + '\\' + participant +'-gyro-combined.csv'
+ 
+    #For each column, keep the values that are not the -1 filler.
+    columns = []
+    for item in fileData.columns:
+        currColumn = fileData[item]
+        columns.append(currColumn[currColumn != -1])
 
-    #With similar logic to the previous loop, write the correct rows to the new file.
-    for x in range(0, len(fileDict)):
-        if accelerometer:
-            if sensorSubset == 'Pelvis':
-                if fileDict[x]['pax_m/s/s'] == '-1' and fileDict[x]['pay_m/s/s'] == '-1' and fileDict[x]['paz_m/s/s'] == '-1':
-                    break
-                else:
-                    currentRow = {'pax_m/s/s':fileDict[x]['pax_m/s/s'], 'pay_m/s/s':fileDict[x]['pay_m/s/s'], 'paz_m/s/s':fileDict[x]['paz_m/s/s']}
-            elif sensorSubset == 'Ankles':
-                if fileDict[x]['lax_m/s/s'] == '-1' and fileDict[x]['lay_m/s/s'] == '-1' and fileDict[x]['laz_m/s/s'] == '-1' and fileDict[x]['rax_m/s/s'] == '-1' and fileDict[x]['ray_m/s/s'] == '-1' and fileDict[x]['raz_m/s/s'] == '-1':
-                    break
-                else:
-                    currentRow = {'lax_m/s/s':fileDict[x]['lax_m/s/s'], 'lay_m/s/s':fileDict[x]['lay_m/s/s'], 'laz_m/s/s':fileDict[x]['laz_m/s/s'], 'rax_m/s/s':fileDict[x]['rax_m/s/s'], 'ray_m/s/s':fileDict[x]['ray_m/s/s'], 'raz_m/s/s':fileDict[x]['raz_m/s/s']}
-            else:
-                currentRow = {'lax_m/s/s':fileDict[x]['lax_m/s/s'], 'lay_m/s/s':fileDict[x]['lay_m/s/s'], 'laz_m/s/s':fileDict[x]['laz_m/s/s'], 'rax_m/s/s':fileDict[x]['rax_m/s/s'], 'ray_m/s/s':fileDict[x]['ray_m/s/s'], 'raz_m/s/s':fileDict[x]['raz_m/s/s'], 'pax_m/s/s':fileDict[x]['pax_m/s/s'], 'pay_m/s/s':fileDict[x]['pay_m/s/s'], 'paz_m/s/s':fileDict[x]['paz_m/s/s']}
+    #Get the maximum index from the first column of each sensor (between left and right ankle, and pelvis).
+    max_index = max(len(columns[x]) for x in range(0, len(columns), 3))
 
-        else:
-            if sensorSubset == 'Pelvis':
-                if fileDict[x]['pgx_deg/s'] == '-1' and fileDict[x]['pgy_deg/s'] == '-1' and fileDict[x]['pgz_deg/s'] == '-1':
-                    break
-                else:
-                    currentRow = {'pgx_deg/s':fileDict[x]['pgx_deg/s'], 'pgy_deg/s':fileDict[x]['pgy_deg/s'], 'pgz_deg/s':fileDict[x]['pgz_deg/s']}
-            elif sensorSubset == 'Ankles':
-                if fileDict[x]['lgx_deg/s'] == '-1' and fileDict[x]['lgy_deg/s'] == '-1' and fileDict[x]['lgz_deg/s'] == '-1' and fileDict[x]['rgx_deg/s'] == '-1' and fileDict[x]['rgy_deg/s'] == '-1' and fileDict[x]['rgz_deg/s'] == '-1':
-                    break
-                else:
-                    currentRow = {'lgx_deg/s':fileDict[x]['lgx_deg/s'], 'lgy_deg/s':fileDict[x]['lgy_deg/s'], 'lgz_deg/s':fileDict[x]['lgz_deg/s'], 'rgx_deg/s':fileDict[x]['rgx_deg/s'], 'rgy_deg/s':fileDict[x]['rgy_deg/s'], 'rgz_deg/s':fileDict[x]['rgz_deg/s']}
-            else:
-                currentRow = {'lgx_deg/s':fileDict[x]['lgx_deg/s'], 'lgy_deg/s':fileDict[x]['lgy_deg/s'], 'lgz_deg/s':fileDict[x]['lgz_deg/s'], 'rgx_deg/s':fileDict[x]['rgx_deg/s'], 'rgy_deg/s':fileDict[x]['rgy_deg/s'], 'rgz_deg/s':fileDict[x]['rgz_deg/s'], 'pgx_deg/s':fileDict[x]['pgx_deg/s'], 'pgy_deg/s':fileDict[x]['pgy_deg/s'], 'pgz_deg/s':fileDict[x]['pgz_deg/s']}
+    #For all the columns, now we fill the new merged segments with -1 as the dataset must still be the same length.
+    values = np.full((max_index, len(columns)), -1.0)
+    for x in range(0, len(columns)):
+        values[:len(columns[x]), x] = columns[x]
+    
+    #Write the entire set of rows to the new file.
+    writeSensorCSV(newFilename, SensorData(None, values, fileData.columns))
 
-        csvwriter.writerow(currentRow)
-    newfile.close()
+#=====================================================
+# A function purely for the S1A2 merging of the combined files of one jump, reading both segments once for every S1A2 subset.
+#
+# s1Filename:           The filename of the combined file of segment 1.
+# s2Filename:           The filename of the combined file of segment 2.
+# accelerometer:        The Boolean value depicting whether the files are an accelerometer or gyroscope.
+def runFinalSegmentMerge(s1Filename, s2Filename, accelerometer):
+    #Merge the two segments, and split the filename by a dash for the participant ID.
+    merged = mergeSegmentDicts(getSensorData(s1Filename), getSensorData(s2Filename))
+    data = s1Filename.split('-')
+
+    #Write the new file with correct participant ID for every S1A2 subset.
+    for subset in subsetLocations:
+        if getSubsetDetails(subset)[0] == 'S1A2':
+            writerLoop(subset, data[0] + '-' + data[1], getSubsetColumns(merged, subset, accelerometer), accelerometer)
 
 #=====================================================
-# Function for taking the entire dataset with All segments of data, and subsetting it depending on which subset we are focused on.
+# A function used for subsetting the segment 2 combined file of one jump into every S2 subset, reading the file once.
 #
-# filename:             The name of the file to read and return.
-def subsetFeatureData(filename):
-    #Get the dictionary of the filename and create a new file of the subsetted information.
-    fileDict = getCSVDict(filename)
-    newFile = open(saveLocation + '\\' + filename, mode = 'w', newline = '')
-    headerItem = []
+# filename:                 Current filename we are focused on.
+# accelerometer:            Boolean value depicting whether the current file is an accelerometer or not.
+def subsetRawData(filename, accelerometer):
+    fileData = getSensorData(filename)
 
-    #Using the save location naming conventions, find the current subset.
-    identifier = saveLocation.split('-')
-    segmentSubset = identifier[0]
-    sensorSubset = identifier[1]
+    for subset in subsetLocations:
+        if getSubsetDetails(subset)[0] != 'S2':
+            continue
+        subsetData = getSubsetColumns(fileData, subset, accelerometer)
 
-    #Depending on which line is uncommented, gives us a different subset of feature data.
-    for value in fileDict[0]:
-        if (sensorSubset == 'Ankles'):
-            if segmentSubset == 'S1A2':
-                if 'time' in value or 'S1_LANK' in value or 'S2_LANK' in value or 'S1_RANK' in value or 'S2_RANK' in value:
-                    headerItem.append(value)
-            else:
-                if 'time' in value or 'S2_LANK' in value or 'S2_RANK' in value:
-                    headerItem.append(value)
-        elif (sensorSubset == 'Pelvis'):
-            if segmentSubset == 'S1A2':
-                if 'time' in value or 'S1_PELV' in value or 'S2_PELV' in value:
-                    headerItem.append(value)
-            else:
-                if 'time' in value or 'S2_PELV' in value:
-                    headerItem.append(value)
-        elif (sensorSubset == 'All'):
-            if segmentSubset == 'S1A2':
-                if 'time' in value or 'S1_LANK' in value or 'S2_LANK' in value or 'S1_RANK' in value or 'S2_RANK' in value or 'S1_PELV' in value or 'S2_PELV' in value:
-                    headerItem.append(value)
-            else:
-                if 'time' in value or 'S2_LANK' in value or 'S2_RANK' in value or 'S2_PELV' in value:
-                    headerItem.append(value)
-        
-    csvWriter = csv.DictWriter(newFile, fieldnames = headerItem)
-    csvWriter.writeheader()
+        #When only one sensor position is kept, the rows end at the first row where every value is the -1 filler.
+        finalIndex = len(subsetData)
+        if getSubsetDetails(subset)[1] != 'All':
+            fillerRows = np.flatnonzero(np.all(subsetData.values == -1, axis = 1))
+            if len(fillerRows) > 0:
+                finalIndex = fillerRows[0]
 
-    #Replicating the same logic as the header, write the relevant features to the new file.
-    for x in range(0, len(fileDict)):
-        currentRow = {}
-        for value in fileDict[x]:
-            if (sensorSubset == 'Ankles'):
-                if segmentSubset == 'S1A2':
-                    if 'time' in value or 'S1_LANK' in value or 'S2_LANK' in value or 'S1_RANK' in value or 'S2_RANK' in value:
-                        currentRow[value] = fileDict[x][value]
-                else:
-                    if 'time' in value or 'S2_LANK' in value or 'S2_RANK' in value:
-                        currentRow[value] = fileDict[x][value]
-            elif (sensorSubset == 'Pelvis'):
-                if segmentSubset == 'S1A2':
-                    if 'time' in value or 'S1_PELV' in value or 'S2_PELV' in value:
-                        currentRow[value] = fileDict[x][value]
-                else:
-                    if 'time' in value or 'S2_PELV' in value:
-                        currentRow[value] = fileDict[x][value]
-            elif (sensorSubset == 'All'):
-                if segmentSubset == 'S1A2':
-                    if 'time' in value or 'S1_LANK' in value or 'S2_LANK' in value or 'S1_RANK' in value or 'S2_RANK' in value or 'S1_PELV' in value or 'S2_PELV' in value:
-                        currentRow[value] = fileDict[x][value]
-                else:
-                    if 'time' in value or 'S2_LANK' in value or 'S2_RANK' in value or 'S2_PELV' in value:
-                        currentRow[value] = fileDict[x][value]
-        #Write the correct row to the new file.
-        csvWriter.writerow(currentRow)
+        #Write the correct rows to the new file.
+        writeSensorCSV(subset + '\\' + filename, subsetData.crop(0, finalIndex))
 
 #=====================================================
 #CHAPTER: Main Running Function for Dividing of the Full Dataset.
@@ -279,7 +195,7 @@ print("----------------------------------")
 currentDirectory = Path.cwd()
 
 #=====================================================
-# Process for creating a new directory using the specified save location.
+# Process for creating a new directory for every subset.
 # While folder input is invalid...
 while(True):
     try:
@@ -289,46 +205,30 @@ while(True):
         directory = os.fsencode(processFolderName)
         os.chdir(processFolderName)
 
-        #Make a new folder so the names of the file can stay the same.
-        exists = os.path.exists(saveLocation)
-        if not exists:
-            os.makedirs(saveLocation)
-            print("The new directory is created!")
+        #Make a new folder for each subset so the names of the file can stay the same.
+        for subset in subsetLocations:
+            if not os.path.exists(subset):
+                os.makedirs(subset)
+                print("The new directory is created: " + subset)
         break
     except:
         print("Directory produced an error. Please try again.")
 
 #=====================================================
-# Variables required for adding the segments into a list to be merged.
-accS1 = []
-accS2 = []
-gyroS1 = []
-gyroS2 = []
-
-#For every file in the current directory...
-for file in os.listdir(directory):
-    #Get the filename and only crop with the correct data files.
-    filename = os.fsdecode(file)
+#For every file in the current directory, write all of the subsets from one read of the file.
+filenames = sorted(os.fsdecode(file) for file in os.listdir(directory))
+for filename in filenames:
     if filename.endswith('feature_list.csv'):
         subsetFeatureData(filename)
-    elif segmentSubset == 'S1A2':
-        if filename.endswith('S1-acc-combined.csv'):
-            accS1.append(filename)
-        elif filename.endswith('S1-gyro-combined.csv'):
-            gyroS1.append(filename)
-        elif filename.endswith('S2-acc-combined.csv'):
-            accS2.append(filename)
-        elif filename.endswith('S2-gyro-combined.csv'):
-            gyroS2.append(filename)
-
-    elif segmentSubset == 'S2':
-        if filename.endswith('S2-acc-combined.csv'):
-            subsetRawData(filename, True)
-        elif filename.endswith('S2-gyro-combined.csv'):
-            subsetRawData(filename, False)
-    else:
-        continue
-
-if segmentSubset == 'S1A2':
-    runFinalSegmentMerge(accS1, accS2, gyroS1, gyroS2)
+    elif filename.endswith(segmentExtension):
+        subsetSegmentFile(filename)
+
+    #The combined files of older segmentation runs are only read when the subsets need them.
+    elif filename.endswith('S1-acc-combined.csv') or filename.endswith('S1-gyro-combined.csv'):
+        s2Filename = 'S2-'.join(filename.rsplit('S1-', 1))
+        if any(getSubsetDetails(subset)[0] == 'S1A2' for subset in subsetLocations) and s2Filename in filenames:
+            runFinalSegmentMerge(filename, s2Filename, filename.endswith('acc-combined.csv'))
+    elif filename.endswith('S2-acc-combined.csv') or filename.endswith('S2-gyro-combined.csv'):
+        if any(getSubsetDetails(subset)[0] == 'S2' for subset in subsetLocations):
+            subsetRawData(filename, filename.endswith('acc-combined.csv'))
 #=====================================================
\ No newline at end of file
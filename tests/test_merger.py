@@ -0,0 +1,44 @@
+#!"C:\Program Files\Python310"
+
+# Import libraries that are used for testing the joining of jumps in the merger.
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import merger
+
+#=====================================================
+#CHAPTER: Tests of the jump IDs of the combined files.
+#=====================================================
+class CombinedJumpKeyTests(unittest.TestCase):
+    #=====================================================
+    # A jump ID holding a dash (i.e., ID 12 and JUMP 2 joined by the score key separator) is kept whole for both segments and sensors.
+    def test_jumpIdWithDash(self):
+        self.assertEqual(merger.getCombinedJumpKey('12-2-S2-acc-combined.csv'), '12-2')
+        self.assertEqual(merger.getCombinedJumpKey('12-2-S2-gyro-combined.csv'), '12-2')
+        self.assertEqual(merger.getCombinedJumpKey('12-2-S1-acc-combined.csv'), '12-2')
+        self.assertEqual(merger.getCombinedJumpKey('12-2-acc-combined.csv'), '12-2')
+
+    #=====================================================
+    # The jump ID of a combined file is the same as the jump ID of its row of scores, so the jump is joined to its scores.
+    def test_jumpIdMatchesScores(self):
+        header = ['Name', 'ID', 'JUMP']
+        row = ['Subject 12', '12', '2']
+        scoreKey = merger.getRowKey(merger.getKeyColumnIndices(header, 'scores_subject.csv'), row)
+        self.assertEqual(merger.getCombinedJumpKey('12-2-S2-acc-combined.csv'), scoreKey)
+
+    #=====================================================
+    # A jump ID without a dash, as written by the segmentation for a participant identifier, is unchanged.
+    def test_jumpIdWithoutDash(self):
+        self.assertEqual(merger.getCombinedJumpKey('P01-S2-acc-combined.csv'), 'P01')
+        self.assertEqual(merger.getCombinedJumpKey('P01-gyro-combined.csv'), 'P01')
+
+    #=====================================================
+    # A file that is not a combined file has no jump ID.
+    def test_otherFile(self):
+        self.assertIsNone(merger.getCombinedJumpKey('feature_list.csv'))
+
+if __name__ == '__main__':
+    unittest.main()
+#=====================================================
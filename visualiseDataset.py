@@ -5,15 +5,94 @@ import csv
 import os
 import matplotlib.pyplot as plt
 from pathlib import Path
+from sessionFile import sessionExtension, segmentExtension, sessionStreams, readSession, readSessionStreams, getSegmentStreamName
 
 # Global variables for the files we may want to visualise, whether we want to save a figure,
 # where these figures would be saved, and which axis of data to visualise.
-#Can be either highg.csv, lowg.csv, acc.csv, or gyro.csv
+#Can be either highg.csv, lowg.csv, acc.csv, or gyro.csv (session files are shown for highg.csv and lowg.csv, and the segment files
+#written by the segmentation, or the combined files when it has combinedOutput enabled, are shown for acc.csv and gyro.csv)
 specifiedFile = "acc.csv"
 saveFile = True
 saveLocation = "imageFiles"
-#Can be either l, r, or p for different positions.
+#Can be either l, r, or p for different positions, which are the sensor labels of the streams of a segment file.
 combinedAxis = 'r'
+segmentSensorLabels = {'l': '_LANK', 'r': '_RANK', 'p': '_PELV'}
+segmentPhases = ['S1', 'S2']
+
+#=====================================================
+#Function for plotting the three axes of one file or stream, and saving or showing the figure.
+#
+# title:            The title of the figure, also used for the saved filename.
+# x:                The values of the x-axis.
+# y:                The values of the y-axis.
+# z:                The values of the z-axis.
+def plotAxes(title, x, y, z):
+    #Set up plot correctly.
+    plt.figure(figsize = (14, 6))
+    plt.title(title)
+    plt.grid(axis = "y")
+
+    #Plot all of the axes with respective colours.
+    plt.plot(x, color = "blue")
+    plt.plot(y, color = "red")
+    plt.plot(z, color = "green")
+
+    #If we want to, save the figure. Otherwise, show the figure. 
+    if saveFile:
+        plt.savefig(saveLocation + "/" + title + ".png")
+    else:
+        plt.show()
+    plt.close()
+
+#=====================================================
+#Function for visualising the accelerometer or gyroscope streams of a session file, depending on the specified file.
+#
+# filename:         The name of the session file to visualise.
+def visualiseSession(filename):
+    try:
+        #The accelerometer streams are at the odd indexes of the group, and the gyroscope streams at the even indexes.
+        if specifiedFile == "highg.csv":
+            streamIndexes = [1, 3, 5]
+        elif specifiedFile == "lowg.csv":
+            streamIndexes = [2, 4, 6]
+        else:
+            return
+
+        #Plot each stream directly from the memory-mapped values.
+        group = readSession(filename)
+        for index in streamIndexes:
+            values = group[index].values
+            plotAxes(filename + "-" + sessionStreams[index - 1], values[:, 0], values[:, 1], values[:, 2])
+
+    except Exception as e:
+        print(e)
+
+#=====================================================
+#Function for visualising the accelerometer or gyroscope streams of one sensor in both segments of a segment file, depending on the specified file.
+#
+# filename:         The name of the segment file to visualise.
+def visualiseSegments(filename):
+    try:
+        if specifiedFile == "acc.csv":
+            accelerometer = True
+        elif specifiedFile == "gyro.csv":
+            accelerometer = False
+        else:
+            return
+
+        #Plot the stream of the chosen sensor for each segment directly from the memory-mapped values, as each one keeps its own length.
+        #The segment files of a subset only hold some of the streams, so the segments without a stream of the sensor are skipped.
+        streams = readSessionStreams(filename)[1]
+        names = [getSegmentStreamName(phase, segmentSensorLabels[combinedAxis], accelerometer) for phase in segmentPhases]
+        names = [name for name in names if name in streams]
+        if len(names) == 0:
+            print("No streams of this sensor in: " + filename)
+        for name in names:
+            values = streams[name].values
+            plotAxes(filename + "-" + name, values[:, 0], values[:, 1], values[:, 2])
+
+    except Exception as e:
+        print(e)
 
 #=====================================================
 #Function for visualising any of the data files we have manipulated throughout processing.
@@ -58,22 +137,8 @@ def visualiseData(filename):
         else:
             return
         
-        #Set up plot correctly.
-        plt.figure(figsize = (14, 6))
-        plt.title(filename)
-        plt.grid(axis = "y")
-
-        #Plot all of the axes with respective colours.
-        plt.plot(x, color = "blue")
-        plt.plot(y, color = "red")
-        plt.plot(z, color = "green")
-
-        #If we want to, save the figure. Otherwise, show the figure. 
-        if saveFile:
-            plt.savefig(saveLocation + "/" + filename + ".png")
-        else:
-            plt.show()
-        plt.close()
+        #Plot and save or show the figure.
+        plotAxes(filename, x, y, z)
 
     except Exception as e:
         print(e)
@@ -114,6 +179,14 @@ for file in os.listdir(directory):
      if filename.endswith('.csv'):
         print("Visualising..." + filename)
         visualiseData(filename)
+
+     elif filename.endswith(sessionExtension):
+        print("Visualising..." + filename)
+        visualiseSession(filename)
+
+     elif filename.endswith(segmentExtension):
+        print("Visualising..." + filename)
+        visualiseSegments(filename)
         
      else:
          continue